@@ -6,7 +6,19 @@ import logging
 import signal
 from time import sleep
 
-from typing import Any, Coroutine, TypeVar
+from typing import Any, Callable, Coroutine, TypeVar
+
+_new_event_loop: Callable[[], asyncio.AbstractEventLoop]
+
+try:
+    # Comes with the server extra (uvicorn[standard]). Only used for loops the app creates itself
+    import uvloop
+
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:  # pragma: no cover
+    _new_event_loop = asyncio.new_event_loop
+
+_eager_task_factory = getattr(asyncio, "eager_task_factory", None)
 
 # from .delayedsignal import DelayedKeyboardInterrupt
 
@@ -37,7 +49,7 @@ class AsyncApplication(abc.ABC):
         try:
             self._loop = asyncio.get_running_loop()
         except RuntimeError:
-            self._loop = asyncio.new_event_loop()
+            self._loop = _new_event_loop()
             self._loop_started_by_self = True
 
         return self._loop
@@ -131,6 +143,11 @@ class AsyncApplication(abc.ABC):
             func_task = self.loop.create_task(self._astart())
 
             self._started = await func_task
+
+            if self._loop_started_by_self and _eager_task_factory is not None:
+                # Python 3.12+: run new tasks eagerly up to their first suspension instead of scheduling them.
+                # Only enabled once started, as the SIGINT handler above needs `func_task` assigned before it runs
+                self.loop.set_task_factory(_eager_task_factory)
         except asyncio.CancelledError:
             if hit_sigint:
                 self._logger.warn("Closing app after SIGINT")
@@ -5,6 +5,7 @@ import logging
 import signal
 from pathlib import Path
 
+from nerddiary.asynctools import asyncapp
 from nerddiary.asynctools.asyncapp import AsyncApplication
 
 import pytest
@@ -128,6 +129,30 @@ def test_start_no_interrupt():
     assert not ma.closed
 
 
+def test_eager_task_factory_after_start(monkeypatch):
+    created = []
+
+    def _factory(loop, coro, **kwargs):
+        created.append(coro)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    monkeypatch.setattr(asyncapp, "_eager_task_factory", _factory)
+
+    factory_on_start = []
+
+    class MockFactoryAsyncApp(MockAsyncApp):
+        async def _astart(self):
+            factory_on_start.append(self.loop.get_task_factory())
+
+    ma = MockFactoryAsyncApp().start()
+    assert not ma.closed
+    assert factory_on_start == [None] and not created
+    assert ma.loop.get_task_factory() is _factory
+
+    assert ma.close()
+    assert created
+
+
 def run_start_interrupt():
     MockSlowAsyncApp(slow_start=1).start()
 
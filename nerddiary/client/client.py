@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import uuid
 from collections import defaultdict
@@ -18,6 +17,7 @@ from ..client.config import NerdDiaryClientConfig
 from ..error.error import NerdDiaryError, NerdDiaryErrorCode
 from ..server.schema import NotificationType, Schema, UserSessionSchema
 from ..server.session.status import UserSessionStatus
+from ..utils import fastjson
 from ..utils.sensitive import mask_sensitive
 from .rpc import AsyncRPCResult
 
@@ -28,6 +28,23 @@ class StopNotificationPropagation(Exception):
     pass
 
 
+_SCHEMA_CLASSES: t.Dict[str, t.Type[Schema]] = {}
+
+
+def _get_schema_class(name: str) -> t.Type[Schema] | None:
+    schema_cls = _SCHEMA_CLASSES.get(name)
+
+    if schema_cls is None:
+        # Rebuild the registry on a miss, in case new schemas were defined since the last lookup
+        def __all_subclasses(cls):
+            return set(cls.__subclasses__()).union([s for c in cls.__subclasses__() for s in __all_subclasses(c)])
+
+        _SCHEMA_CLASSES.update((cls.__name__, cls) for cls in __all_subclasses(Schema))
+        schema_cls = _SCHEMA_CLASSES.get(name)
+
+    return schema_cls
+
+
 class NerdDiaryClient(AsyncApplication):
     def __init__(
         self,
@@ -188,7 +205,7 @@ class NerdDiaryClient(AsyncApplication):
         has_sent = False
         while not has_sent and self._running:
             try:
-                await self._ws.send(json.dumps(req))
+                await self._ws.send(fastjson.dumps(req))
                 has_sent = True
             except ConnectionClosedOK:
                 self._logger.debug("Server disconnected normally")
@@ -241,20 +258,14 @@ class NerdDiaryClient(AsyncApplication):
                     raw_response = raw_response.decode()
 
                 self._logger.debug(f"Recieved message <{mask_sensitive(str(raw_response))}>")
-                parsed_response = json.loads(raw_response)
-
-                if "notification" in parsed_response:
-                    # Process notification
-                    try:
-                        n_type = NotificationType(int(parsed_response["notification"]))
-                        self._logger.debug(f"Recieved <{n_type.name}> notification. Scheduling processing")
-                        self._notification_handler_tasks.add(
-                            asyncio.create_task(self._process_notification(n_type, parsed_response["data"]))
-                        )
-                    except ValueError:
-                        self._logger.debug(
-                            f"Recieved unsupported notification <{parsed_response['notification']}>. Ignoring"
-                        )
+                parsed_response = fastjson.loads(raw_response)
+
+                if isinstance(parsed_response, list):
+                    # Server batches bursts of notifications into a single message
+                    for notification in parsed_response:
+                        self._schedule_notification(notification)
+                elif "notification" in parsed_response:
+                    self._schedule_notification(parsed_response)
                 else:
                     # Process RPC call response
                     match parse(parsed_response):
@@ -305,6 +316,16 @@ class NerdDiaryClient(AsyncApplication):
     def _stop(self):
         self._running = False
 
+    def _schedule_notification(self, notification: t.Dict[str, t.Any]):
+        try:
+            n_type = NotificationType(int(notification["notification"]))
+            self._logger.debug(f"Recieved <{n_type.name}> notification. Scheduling processing")
+            self._notification_handler_tasks.add(
+                asyncio.create_task(self._process_notification(n_type, notification["data"]))
+            )
+        except ValueError:
+            self._logger.debug(f"Recieved unsupported notification <{notification['notification']}>. Ignoring")
+
     async def _process_notification(self, n_type: NotificationType, raw_data: t.Dict[str, t.Any] | None = None):
         data = None
         if raw_data:
@@ -385,19 +406,12 @@ class NerdDiaryClient(AsyncApplication):
             return None
 
     def _parse_server_data(self, data: t.Dict[str, t.Any], context: str = "") -> Schema | None:
-        def __all_subclasses(cls):
-            return set(cls.__subclasses__()).union([s for c in cls.__subclasses__() for s in __all_subclasses(c)])
-
         if "schema" not in data or "data" not in data:
             err = f"Incorrect data from the server: 'schema' or 'data' keys are missing. {context=}"
             self._logger.error(err)
             return None
 
-        schema_cls = None
-        for cls in __all_subclasses(Schema):
-            if cls.__name__ == data["schema"]:
-                schema_cls = cls
-                break
+        schema_cls = _get_schema_class(data["schema"])
 
         if schema_cls is None:
             err = f"Schema class {data['schema']} doesn't exist. Returned by remote {context=}"
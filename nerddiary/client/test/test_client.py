@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import asyncio
+
+from nerddiary.client.client import NerdDiaryClient
+from nerddiary.server.schema import ClientSchema, NotificationType, generate_notification, generate_notifications
+
+
+class MockWebSocket:
+    def __init__(self, *messages: str):
+        self._messages = list(messages)
+
+    async def recv(self) -> str:
+        if not self._messages:
+            raise asyncio.CancelledError()
+
+        return self._messages.pop(0)
+
+
+class TestClient:
+    async def test_message_dispatch_unpacks_batch(self):
+        ndc = NerdDiaryClient()
+
+        scheduled = []
+        ndc._schedule_notification = scheduled.append
+
+        ndc._ws = MockWebSocket(
+            generate_notifications(
+                [
+                    (NotificationType.SERVER_CLIENT_CONNECTED, ClientSchema(client_id="a")),
+                    (NotificationType.SERVER_CLIENT_DISCONNECTED, ClientSchema(client_id="b")),
+                ]
+            ),
+            generate_notification(NotificationType.SERVER_POLL_REMINDER),
+        )
+        ndc._running = True
+
+        await ndc._message_dispatch()
+
+        assert [n["notification"] for n in scheduled] == [
+            str(NotificationType.SERVER_CLIENT_CONNECTED.value),
+            str(NotificationType.SERVER_CLIENT_DISCONNECTED.value),
+            str(NotificationType.SERVER_POLL_REMINDER.value),
+        ]
+        assert [n["data"] for n in scheduled] == [
+            {"schema": "ClientSchema", "data": {"client_id": "a"}},
+            {"schema": "ClientSchema", "data": {"client_id": "b"}},
+            None,
+        ]
@@ -1,8 +1,10 @@
 import pytest
 
+from .data import crypto
 from .data.data import DataProvider
 from .poll.poll import Poll
 from .user.user import User
+from .utils import fastjson
 
 
 def pytest_collection_modifyitems(items):
@@ -47,90 +49,97 @@ def test_data_provider(test_data_path):
     return DataProvider.get_data_provider("sqllite", {"base_path": str(test_data_path)})
 
 
-@pytest.fixture(scope="class")
-def mockpoll():
-    json = """
-    {
-        "poll_name": "Headache",
-        "command": "head",
-        "description": "Headache poll!",
-        "reminder_time": "20:00",
-        "once_per_day": "true",
-        "hours_over_midgnight": 2,
-        "questions": [
-            {
-                "type": "timestamp",
-                "code": "start_time",
-                "display_name": "When did it start?",
-                "description": "Type in how many hours ago did it start aching"
+@pytest.fixture
+def fast_kdf(monkeypatch):
+    """Lowers PBKDF2 iterations for tests that don't assert on key derivation itself"""
+    monkeypatch.setattr(crypto, "ITERATIONS", 1000)
+
+
+MOCKPOLL_JSON = """
+{
+    "poll_name": "Headache",
+    "command": "head",
+    "description": "Headache poll!",
+    "reminder_time": "20:00",
+    "once_per_day": "true",
+    "hours_over_midgnight": 2,
+    "questions": [
+        {
+            "type": "timestamp",
+            "code": "start_time",
+            "display_name": "When did it start?",
+            "description": "Type in how many hours ago did it start aching"
+        },
+        {
+            "type": {
+                "select": [
+                    {"No": "😭 No"},
+                    {"Yes": "😀 Yes"}
+                ]
             },
-            {
-                "type": {
-                    "select": [
-                        {"No": "😭 No"},
-                        {"Yes": "😀 Yes"}
-                    ]
-                },
-                "code": "finished",
-                "display_name": "Has it finished?",
-                "description": "If you still experience headche - answer No and I will ask again in 3 hours",
-                "ephemeral": true,
-                "delay_time": 2,
-                "delay_on": ["No"]
+            "code": "finished",
+            "display_name": "Has it finished?",
+            "description": "If you still experience headche - answer No and I will ask again in 3 hours",
+            "ephemeral": true,
+            "delay_time": 2,
+            "delay_on": ["No"]
+        },
+        {
+            "type": {
+                "select": [
+                    {"tension": "😬 Tension"},
+                    {"migraine": "😰 Migraine"},
+                    {"other": "🤷‍♀️ Other"}
+                ]
             },
-            {
-                "type": {
-                    "select": [
-                        {"tension": "😬 Tension"},
-                        {"migraine": "😰 Migraine"},
-                        {"other": "🤷‍♀️ Other"}
-                    ]
-                },
-                "code": "headache_type",
-                "display_name": "What type of headache was it?",
-                "description": "Choose among provided headache types"
+            "code": "headache_type",
+            "display_name": "What type of headache was it?",
+            "description": "Choose among provided headache types"
+        },
+        {
+            "type": {
+                "select": [
+                    {"ibuprofen": "😬 Tension"},
+                    {"nurtec": "😰 Migraine"},
+                    {"none": "🤷‍♀️ Other"}
+                ]
             },
-            {
-                "type": {
-                    "select": [
-                        {"ibuprofen": "😬 Tension"},
-                        {"nurtec": "😰 Migraine"},
-                        {"none": "🤷‍♀️ Other"}
+            "code": "drug_type",
+            "display_name": "What drug did you use?",
+            "description": "Choose among provided drugs or select none if you did not take any"
+        },
+        {
+            "type": {
+                "select": {
+                    "ibuprofen": [
+                        {"200": "💊 200"},
+                        {"400": "💊💊 400"}
+                    ],
+                    "nurtec": [
+                        {"1": "💊 1"},
+                        {"2": "💊💊 2"}
+                    ],
+                    "none": [
+                        {"0": "No 💊 today!"}
                     ]
-                },
-                "code": "drug_type",
-                "display_name": "What drug did you use?",
-                "description": "Choose among provided drugs or select none if you did not take any"
+                }
             },
-            {
-                "type": {
-                    "select": {
-                        "ibuprofen": [
-                            {"200": "💊 200"},
-                            {"400": "💊💊 400"}
-                        ],
-                        "nurtec": [
-                            {"1": "💊 1"},
-                            {"2": "💊💊 2"}
-                        ],
-                        "none": [
-                            {"0": "No 💊 today!"}
-                        ]
-                    }
-                },
-                "code": "drug_dose",
-                "display_name": "What dose?",
-                "description": "Choose among provided drugs or select none if you did not take any",
-                "depends_on": "drug_type"
-            }
-        ]
-    }
-    """
-
-    return Poll.parse_raw(json)
+            "code": "drug_dose",
+            "display_name": "What dose?",
+            "description": "Choose among provided drugs or select none if you did not take any",
+            "depends_on": "drug_type"
+        }
+    ]
+}
+"""
 
 
-@pytest.fixture(scope="class")
+@pytest.fixture(scope="session")
+def mockpoll():
+    return Poll.parse_obj(fastjson.loads(MOCKPOLL_JSON))
+
+
+@pytest.fixture(scope="session")
 def mockuser(mockpoll):
     user = User(
         id="123",
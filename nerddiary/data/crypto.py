@@ -1,18 +1,41 @@
+import hashlib
 import secrets
+import struct
 from base64 import urlsafe_b64decode as b64d
 from base64 import urlsafe_b64encode as b64e
+from collections import OrderedDict
 
 from cryptography.fernet import Fernet
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+from typing import Iterable, List, Tuple
+
 BACKEND = default_backend()
 ITERATIONS = 390000
+# version(1) || salt(16) || iterations(4, big endian)
+_HEADER = struct.Struct(">B16sI")
+# Not a base64 character, so binary tokens can't be confused with legacy base64 ones
+_TOKEN_VERSION = 1
+# salt(16) || iterations(4, big endian), the header of legacy base64 tokens
+_SALT_ITERATIONS = struct.Struct(">16sI")
+
+
+# Derived keys are memoized in-process (never persisted), so reopening the same user's data skips the slow PBKDF2 run.
+# Keyed on a digest of the inputs, so plaintext passwords are never kept around as cache keys
+_KEY_CACHE_SIZE = 128
+_key_cache: OrderedDict[bytes, bytes] = OrderedDict()
 
 
 def _derive_key(password: bytes, salt: bytes, iterations: int = ITERATIONS) -> bytes:
     """Derive a secret key from a given password and salt"""
+    cache_key = hashlib.sha256(_SALT_ITERATIONS.pack(salt, iterations) + password).digest()
+    key = _key_cache.get(cache_key)
+    if key is not None:
+        _key_cache.move_to_end(cache_key)
+        return key
+
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
@@ -20,7 +43,28 @@ def _derive_key(password: bytes, salt: bytes, iterations: int = ITERATIONS) -> b
         iterations=iterations,
         backend=BACKEND,
     )
-    return b64e(kdf.derive(password))
+    key = _key_cache[cache_key] = b64e(kdf.derive(password))
+    if len(_key_cache) > _KEY_CACHE_SIZE:
+        _key_cache.popitem(last=False)
+
+    return key
+
+
+def _split_token(token: bytes) -> Tuple[bytes, int, bytes]:
+    """Splits a stored token into (salt, iterations, fernet_token).
+
+    Tokens are stored as `version(1) || salt(16) || iterations(4) || fernet_token`. Tokens written by older versions were urlsafe-base64 encoded as a whole (with the fernet token base64 decoded inside) and had no version byte. Those consist of base64 characters only, which is how the two are told apart
+    """
+    if len(token) > _HEADER.size and token[0] == _TOKEN_VERSION:
+        _, salt, iterations = _HEADER.unpack_from(token)
+        return salt, iterations, token[_HEADER.size :]
+
+    decoded = b64d(token)
+    if len(decoded) < _SALT_ITERATIONS.size:
+        raise ValueError("Malformed token")
+
+    salt, iterations = _SALT_ITERATIONS.unpack_from(decoded)
+    return salt, iterations, b64e(decoded[_SALT_ITERATIONS.size :])
 
 
 class EncryptionProdiver:
@@ -45,9 +89,7 @@ class EncryptionProdiver:
             raise ValueError("`password_or_key` must be either a `str` password ot `bytes` key")
 
         if init_token is not None:
-            decoded = b64d(init_token)
-            salt, iter, token = decoded[:16], decoded[16:20], b64e(decoded[20:])
-            iterations = int.from_bytes(iter, "big")
+            salt, iterations, token = _split_token(init_token)
             key = key or _derive_key(password.encode(), salt, iterations)
             init_message = Fernet(key).decrypt(token)
 
@@ -57,6 +99,8 @@ class EncryptionProdiver:
         self._iterations = iterations or ITERATIONS
         self._salt = salt or secrets.token_bytes(16)
         self._key = key or _derive_key(password.encode(), self._salt, self._iterations)
+        self._fernet = Fernet(self._key)
+        self._header = _HEADER.pack(_TOKEN_VERSION, self._salt, self._iterations)
 
     @property
     def salt(self) -> bytes:
@@ -72,14 +116,7 @@ class EncryptionProdiver:
 
     def encrypt(self, message: bytes) -> bytes:
         """Encrypts message and stores it alongside the salt & iterations"""
-        return b64e(
-            b"%b%b%b"
-            % (
-                self._salt,
-                self._iterations.to_bytes(4, "big"),
-                b64d(Fernet(self._key).encrypt(message)),
-            )
-        )
+        return self._header + self._fernet.encrypt(message)
 
     def decrypt(self, token: bytes) -> bytes:
         """Validates the message has the same salt & iterations stored and then decrypts the message.
@@ -89,9 +126,31 @@ class EncryptionProdiver:
         Throws `cryptography.fernet.InvalidToken` if salt and iterations match but decryption failed (meaning somehow the correct salt/iteration was given during initialization but the password is incorrect)
         """
 
-        decoded = b64d(token)
-        salt, iter, token = decoded[:16], decoded[16:20], b64e(decoded[20:])
-        iterations = int.from_bytes(iter, "big")
+        # Fast path: binary token written by this provider, header compared in place without parsing
+        if token.startswith(self._header):
+            return self._fernet.decrypt(token[_HEADER.size :])
+
+        salt, iterations, token = _split_token(token)
         if salt != self._salt or iterations != self._iterations:
             raise ValueError("Salt or iterations mismatch")
-        return Fernet(self._key).decrypt(token)
+        return self._fernet.decrypt(token)
+
+    def decrypt_many(self, tokens: Iterable[bytes]) -> List[bytes]:
+        """Same as `decrypt` for each of the `tokens`, but runs the header checks and decryption in a single tight loop with the provider's cipher bound once"""
+
+        own_header, own_salt, own_iterations = self._header, self._salt, self._iterations
+        decrypt = self._fernet.decrypt
+        header_size = _HEADER.size
+
+        ret = []
+        for token in tokens:
+            if token.startswith(own_header):
+                ret.append(decrypt(token[header_size:]))
+                continue
+
+            salt, iterations, token = _split_token(token)
+            if salt != own_salt or iterations != own_iterations:
+                raise ValueError("Salt or iterations mismatch")
+            ret.append(decrypt(token))
+
+        return ret
@@ -2,19 +2,24 @@ from __future__ import annotations
 
 import datetime
 import enum
+import itertools
+import os
+import threading
+import time
+import zlib
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
 
 import arrow
 import sqlalchemy as sa
 from cryptography.fernet import InvalidToken
-from pydantic import BaseModel, DirectoryPath, ValidationError
 from sqlalchemy.dialects.sqlite import BLOB
-from sqlalchemy.sql.expression import Select
+from sqlalchemy.sql.expression import Insert, Select
 
 from .crypto import EncryptionProdiver
 
-from typing import Any, ClassVar, Dict, List, Tuple, Type
+from typing import Any, ClassVar, Dict, Iterator, List, Set, Tuple, Type
 
 
 class DataCorruptionType(enum.Enum):
@@ -50,23 +55,17 @@ class IncorrectPasswordKeyError(Exception):
 
 class DataProvider(ABC):
     name: ClassVar[str]
+    supported_providers: ClassVar[Dict[str, Type[DataProvider]]] = {}
 
     def __init__(self, params: Dict[str, Any] | None) -> None:
         super().__init__()
 
-    @classmethod
-    @property
-    def supported_providers(cls) -> Dict[str, Type[DataProvider]]:
-        def all_subclasses(cls) -> Dict[str, Type[DataProvider]]:
-            subc = {} | {cl.name: cl for cl in cls.__subclasses__()}
-
-            sub_subc = {}
-            for c in subc.values():
-                sub_subc |= all_subclasses(c)
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
 
-            return subc | sub_subc
-
-        return all_subclasses(cls)
+        # Register concrete providers once, at class definition time
+        if "name" in cls.__dict__:
+            DataProvider.supported_providers[cls.name] = cls
 
     def get_connection(self, user_id: str, password_or_key: str | bytes) -> DataConnection:
         """Creates a data connection for a new or existing user. Checks for correct password/key and data corruption.
@@ -79,8 +78,10 @@ class DataProvider(ABC):
         """
         encr = None
 
-        if not self.check_lock_exist(user_id):
-            if self.check_user_data_exist(user_id):
+        lock_exists, user_data_exists = self._probe_user(user_id)
+
+        if not lock_exists:
+            if user_data_exists:
                 raise DataCorruptionError(DataCorruptionType.USER_DATA_NO_LOCK)
 
             if not isinstance(password_or_key, str):
@@ -110,6 +111,14 @@ class DataProvider(ABC):
     def _get_connection(self, user_id: str, encr: EncryptionProdiver) -> DataConnection:
         pass  # pragma: no cover
 
+    def close(self) -> None:
+        """Releases any resources (e.g. pooled connections) held by this provider. The provider remains usable"""
+        pass  # pragma: no cover
+
+    def _probe_user(self, user_id: str) -> Tuple[bool, bool]:
+        """Returns (`check_lock_exist()`, `check_user_data_exist()`) for `user_id`. Providers may override this to answer both with a single storage round-trip"""
+        return self.check_lock_exist(user_id), self.check_user_data_exist(user_id)
+
     @abstractmethod
     def get_user_list(self) -> List[str]:
         pass
@@ -138,18 +147,20 @@ class DataProvider(ABC):
     @classmethod
     def validate_params(cls, name: str, params: Dict[str, Any] | None) -> bool:
 
-        if name not in cls.supported_providers:
+        provider = DataProvider.supported_providers.get(name)
+        if provider is None:
             raise NotImplementedError(f"Data provider {name} doesn't exist")
 
-        return cls.supported_providers[name]._validate_params(params)
+        return provider._validate_params(params)
 
     @classmethod
     def get_data_provider(cls, name: str, params: Dict[str, Any] | None) -> DataProvider:
 
-        if name not in cls.supported_providers:
+        provider = DataProvider.supported_providers.get(name)
+        if provider is None:
             raise NotImplementedError(f"Data provider {name} doesn't exist")
 
-        return cls.supported_providers[name](params)
+        return provider(params)
 
 
 class DataConnection(ABC):
@@ -173,8 +184,12 @@ class DataConnection(ABC):
     def key(self) -> bytes:
         return self._encryption_provider.key
 
+    def close(self) -> None:
+        """Releases any resources (connections, file handles) held by this connection"""
+        pass  # pragma: no cover
+
     @abstractmethod
-    def store_user_data(self, data: str, category: str) -> bool:
+    def store_user_data(self, data: str | bytes, category: str) -> bool:
         """Saves serialized config"""
         pass  # pragma: no cover
 
@@ -184,27 +199,57 @@ class DataConnection(ABC):
         pass  # pragma: no cover
 
     @abstractmethod
-    def append_log(self, poll_code: str, poll_ts: datetime.datetime, log: str) -> bool:
+    def append_log(self, poll_code: str, poll_ts: datetime.datetime, log: str | bytes) -> bool:
         """Appends a single serialized `log` for a given `poll_code`
 
         Args:
             poll_code (str): poll code
             poll_ts (datetime.datetime): poll timestamp - the date to which this log belongs
-            log (str): seriazlized poll answers (log)
+            log (str | bytes): seriazlized poll answers (log). `bytes` are expected to be utf-8 encoded and are stored as is
 
         Returns:
             bool: 'True' if append was succesful
         """
         pass  # pragma: no cover
 
-    def update_log(self, id: int, poll_ts: datetime.datetime | None = None, log: str | None = None) -> bool:
+    def append_logs(self, poll_code: str, logs: List[Tuple[datetime.datetime, str | bytes]]) -> int:
+        """Appends multiple serialized `logs` for a given `poll_code`
+
+        Args:
+            poll_code (str): poll code
+            logs (List[Tuple[datetime.datetime, str | bytes]]): list of (poll timestamp, serialized poll answers) pairs
+
+        Returns:
+            int: number of appended logs
+        """
+        count = 0
+        for poll_ts, log in logs:
+            if self.append_log(poll_code, poll_ts, log):
+                count += 1
+
+        return count
+
+    def update_log(self, id: int, poll_ts: datetime.datetime | None = None, log: str | bytes | None = None) -> bool:
         """Updates a log identified by `id` with a new serialized `log`"""
         raise NotImplementedError("This provider doesn't support row updates")  # pragma: no cover
 
+    def update_logs(self, logs: List[Tuple[int, datetime.datetime, str | bytes]]) -> int:
+        """Updates multiple logs given as (`id`, `poll_ts`, `log`) tuples. Returns number of updated logs"""
+        count = 0
+        for id, poll_ts, log in logs:
+            if self.update_log(id, poll_ts=poll_ts, log=log):
+                count += 1
+
+        return count
+
     def get_all_logs(self) -> List[Tuple[int, str, datetime.datetime, str]]:
         """Get all serialized logs"""
         return self.get_poll_logs()
 
+    def iter_all_logs(self) -> Iterator[Tuple[int, str, datetime.datetime, str]]:
+        """Same as `get_all_logs`, but yields logs one by one"""
+        return self.iter_poll_logs()
+
     def get_log(self, id: int) -> Tuple[int, str, datetime.datetime, str]:
         """Get a single serialized log identified by `id`"""
         ret = self.get_logs([id])
@@ -231,6 +276,17 @@ class DataConnection(ABC):
         """Get a list of serialized logs for a given `poll_code` sorted by creation date, optionally filtered by `date_from`, `date_to` and optionally limited to `max_rows`+`skip` starting from `skip` (ordered by date DESC)"""
         raise NotImplementedError("This provider doesn't support retrieving rows")  # pragma: no cover
 
+    def iter_poll_logs(
+        self,
+        poll_code: str | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+        max_rows: int | None = None,
+        skip: int | None = None,
+    ) -> Iterator[Tuple[int, str, datetime.datetime, str]]:
+        """Same as `get_poll_logs`, but yields logs one by one. Providers may override this to stream rows from storage instead of loading them all in memory"""
+        return iter(self.get_poll_logs(poll_code, date_from, date_to, max_rows, skip))
+
     def get_last_n_logs(
         self,
         count: int,
@@ -241,28 +297,127 @@ class DataConnection(ABC):
         return self.get_poll_logs(poll_code=poll_code, max_rows=count, skip=skip)
 
 
-class SQLLiteProviderParams(BaseModel):
-    base_path: DirectoryPath
-
-    class Config:
-        extra = "forbid"
+@dataclass(frozen=True, slots=True)
+class SQLLiteProviderParams:
+    base_path: Path
 
 
 class SQLLiteProvider(DataProvider):
     name = "sqllite"
     BASE_URI = "sqlite:///"
     DB_FILE_NAME = "data.db"
+    LOCK_FILE_NAME = "lock"
+    COMPILED_CACHE_SIZE = 500
     POLL_LOG_TABLE = "poll_log"
     USER_DATA_TABLE = "user_data"
 
     def __init__(self, params: Dict[str, Any]) -> None:
         super().__init__(params)
 
-        self._params = SQLLiteProviderParams.parse_obj(params)
+        if not self._validate_params(params):
+            raise ValueError(f"Incorrect {self.name} data provider params: {params!r}")
+
+        self._params = SQLLiteProviderParams(base_path=Path(params["base_path"]))
+        self._user_paths_cache: Dict[str, Tuple[Path, Path, Path]] = {}
+        self._db_uris: Dict[str, str] = {}
+        self._engines: Dict[str, sa.engine.Engine] = {}
+        self._ensured_dirs: Set[str] = set()
+        # Users whose database schema has already been verified/created through this provider
+        self._initialized_dbs: Set[str] = set()
+        self._initialized_dbs_lock = threading.Lock()
+        # Compiled SQL shared by all user engines of this provider
+        self._compiled_cache = sa.util.LRUCache(self.COMPILED_CACHE_SIZE)
+
+    def _user_paths(self, user_id: str) -> Tuple[Path, Path, Path]:
+        """Returns (user_dir, db_path, lock_path) for `user_id`, computed once per user"""
+        paths = self._user_paths_cache.get(user_id)
+
+        if paths is None:
+            user_dir = self._params.base_path / user_id
+            paths = self._user_paths_cache[user_id] = (
+                user_dir,
+                user_dir / self.DB_FILE_NAME,
+                user_dir / self.LOCK_FILE_NAME,
+            )
+
+        return paths
+
+    def _ensure_user_dir(self, user_id: str) -> None:
+        """Creates `user_id` data directory if needed. Only the first call per user touches the filesystem"""
+        if user_id in self._ensured_dirs:
+            return
+
+        user_dir, _, _ = self._user_paths(user_id)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        self._ensured_dirs.add(user_id)
+
+    def _get_engine(self, user_id: str) -> sa.engine.Engine:
+        """Returns SQLAlchemy engine for the `user_id` database. Engines are created once per user and shared by all of its connections"""
+        engine = self._engines.get(user_id)
+
+        if engine is None:
+            # QueuePool keeps DB-API connections alive between calls, so SQLite page cache and PRAGMA setup survive
+            # across `engine.connect()` checkouts. A pooled connection is only used by one thread at a time
+            engine = self._engines[user_id] = sa.create_engine(
+                self._db_uri(user_id),
+                poolclass=sa.pool.QueuePool,
+                connect_args={"check_same_thread": False},
+                # Explicit, so statement caching stays on regardless of engine-level defaults
+                execution_options={"compiled_cache": self._compiled_cache},
+            )
+            sa.event.listen(engine, "connect", _set_sqlite_pragmas)
+
+        return engine
+
+    def close(self) -> None:
+        # Engines stay usable after dispose, a new connection is opened on the next checkout
+        for engine in self._engines.values():
+            engine.dispose()
+
+        with self._initialized_dbs_lock:
+            self._initialized_dbs.clear()
+
+    def _reset_user_db(self, user_id: str) -> None:
+        """Forgets cached state and pooled connections of `user_id`, whose database file is gone"""
+        self._ensured_dirs.discard(user_id)
+
+        with self._initialized_dbs_lock:
+            self._initialized_dbs.discard(user_id)
+
+        # Pooled connections would otherwise keep pointing at the deleted file
+        engine = self._engines.get(user_id)
+        if engine is not None:
+            engine.dispose()
+
+    def _db_uri(self, user_id: str) -> str:
+        """Returns SQLAlchemy URI of the `user_id` database, computed once per user"""
+        uri = self._db_uris.get(user_id)
+
+        if uri is None:
+            _, db_path, _ = self._user_paths(user_id)
+            uri = self._db_uris[user_id] = self.BASE_URI + str(db_path)
+
+        return uri
 
     def _get_connection(self, user_id: str, encr: EncryptionProdiver) -> SQLLiteConnection:
         return SQLLiteConnection(self, user_id, encr)
 
+    def _probe_user(self, user_id: str) -> Tuple[bool, bool]:
+        user_dir, _, _ = self._user_paths(user_id)
+
+        # One directory read answers both questions, and a missing user dir means a brand-new user
+        try:
+            with os.scandir(user_dir) as entries:
+                files = {entry.name for entry in entries if entry.is_file()}
+        except (FileNotFoundError, NotADirectoryError):
+            files = set()
+
+        db_exists = self.DB_FILE_NAME in files
+        if not db_exists:
+            self._reset_user_db(user_id)
+
+        return self.LOCK_FILE_NAME in files, db_exists
+
     def get_user_list(self) -> List[str]:
         ret = []
 
@@ -273,14 +428,14 @@ class SQLLiteProvider(DataProvider):
         return ret
 
     def check_user_data_exist(self, user_id: str, category: str | None = None) -> bool:
-        data_path = self._params.base_path.joinpath(user_id, self.DB_FILE_NAME)
-        db_exists = data_path.exists() and data_path.is_file()
+        _, data_path, _ = self._user_paths(user_id)
+        db_exists = os.path.isfile(data_path)
 
         if category is None or not db_exists:
             return db_exists
 
         # TODO: check user id is a valid folder path
-        engine = sa.create_engine(self.BASE_URI + str(self._params.base_path.joinpath(user_id, self.DB_FILE_NAME)))
+        engine = self._get_engine(user_id)
 
         with engine.connect() as conn:
             result = conn.execute(sa.text(f"SELECT count(*) FROM {self.USER_DATA_TABLE} WHERE category='{category}'"))
@@ -291,22 +446,21 @@ class SQLLiteProvider(DataProvider):
                 return False
 
     def check_lock_exist(self, user_id: str) -> bool:
-        lock_path = self._params.base_path.joinpath(user_id, "lock")
-        return lock_path.exists() and lock_path.is_file()
+        _, _, lock_path = self._user_paths(user_id)
+        return os.path.isfile(lock_path)
 
     def get_lock(self, user_id: str) -> bytes | None:
+        _, _, lock_path = self._user_paths(user_id)
 
-        if not self.check_lock_exist(user_id):
+        # Read directly instead of stat-ing first; a missing lock is the exceptional case here
+        try:
+            return lock_path.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
             return None
 
-        lock_path = self._params.base_path.joinpath(user_id, "lock")
-        return lock_path.read_bytes()
-
     def save_lock(self, user_id: str, lock: bytes) -> bool:
-        assert isinstance(self._params.base_path, Path)
-
-        self._params.base_path.joinpath(user_id).mkdir(parents=True, exist_ok=True)
-        lock_path = self._params.base_path.joinpath(user_id, "lock")
+        _, _, lock_path = self._user_paths(user_id)
+        self._ensure_user_dir(user_id)
 
         try:
             lock_path.write_bytes(lock)
@@ -317,15 +471,71 @@ class SQLLiteProvider(DataProvider):
 
     @classmethod
     def _validate_params(cls, params: Dict[str, Any] | None) -> bool:
-        try:
-            SQLLiteProviderParams.parse_obj(params)
-        except ValidationError:
+        if not isinstance(params, dict) or params.keys() != {"base_path"}:
             return False
 
-        return True
+        base_path = params["base_path"]
+        if not isinstance(base_path, (str, os.PathLike)):
+            return False
+
+        return Path(base_path).is_dir()
+
+
+def _now_us() -> int:
+    """Current UTC time as integer microseconds since epoch"""
+    return time.time_ns() // 1000
+
+
+def _to_bytes(data: str | bytes) -> bytes:
+    return data if isinstance(data, bytes) else data.encode()
+
+
+# Log payloads are prefixed with a format byte before encryption (since schema version 1)
+_LOG_FORMAT_RAW = b"\x00"
+_LOG_FORMAT_ZLIB = b"\x01"
+# Smaller logs rarely shrink enough to be worth the compression work
+_LOG_COMPRESS_MIN_SIZE = 256
+
+
+def _pack_log(log: bytes) -> bytes:
+    if len(log) >= _LOG_COMPRESS_MIN_SIZE:
+        compressed = zlib.compress(log, 3)
+        if len(compressed) < len(log):
+            return _LOG_FORMAT_ZLIB + compressed
+
+    return _LOG_FORMAT_RAW + log
+
+
+def _unpack_log(payload: bytes) -> bytes:
+    match payload[:1]:
+        case b"\x00":
+            return payload[1:]
+        case b"\x01":
+            return zlib.decompress(payload[1:])
+        case _:
+            raise ValueError("Unknown log payload format")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    # Only takes effect for a new (empty) database, so it has to go before the WAL switch that initializes the file
+    cursor.execute("PRAGMA page_size=8192")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
 
 
 class SQLLiteConnection(DataConnection):
+    YIELD_PER = 256
+    # Conservative SQLITE_MAX_VARIABLE_NUMBER (999 for SQLite < 3.32)
+    MAX_BIND_PARAMS = 900
+    # Stored in the database `user_version`. Databases with an older version are migrated on first open
+    # 1: log payloads are prefixed with a format byte
+    SCHEMA_VERSION = 1
+
     def __init__(
         self,
         data_provider: SQLLiteProvider,
@@ -334,14 +544,12 @@ class SQLLiteConnection(DataConnection):
     ) -> None:
         super().__init__(data_provider, user_id, encryption_provider)
 
-        base_path = data_provider._params.base_path
-        base_path.joinpath(self.user_id).mkdir(exist_ok=True)
+        self._user_dir, self._db_path, _ = data_provider._user_paths(user_id)
+        self._db_uri = data_provider._db_uri(user_id)
+        data_provider._ensure_user_dir(user_id)
 
         # TODO: check user id is a valid folder path
-        self._engine = engine = sa.create_engine(
-            data_provider.BASE_URI
-            + str(data_provider._params.base_path.joinpath(self.user_id, data_provider.DB_FILE_NAME))
-        )
+        self._engine = engine = data_provider._get_engine(user_id)
 
         self._meta = meta = sa.MetaData()
 
@@ -349,11 +557,20 @@ class SQLLiteConnection(DataConnection):
             data_provider.POLL_LOG_TABLE,
             meta,
             sa.Column("id", sa.Integer, primary_key=True, index=True, nullable=False),
-            sa.Column("poll_code", sa.String, index=True, unique=False, nullable=False),
+            sa.Column("poll_code", sa.String, unique=False, nullable=False),
             sa.Column("poll_ts", sa.TIMESTAMP(timezone=True), index=True, unique=False, nullable=False),
             sa.Column("log", BLOB, nullable=False),
-            sa.Column("created_ts", sa.TIMESTAMP(timezone=True), nullable=False),
-            sa.Column("updated_ts", sa.TIMESTAMP(timezone=True), nullable=False),
+            # Audit timestamps are only ever written, stored as integer microseconds since epoch (UTC)
+            sa.Column("created_ts", sa.BigInteger, nullable=False),
+            sa.Column("updated_ts", sa.BigInteger, nullable=False),
+        )
+
+        # Serves `get_poll_logs` filtered by poll_code: seek by code, then range scan / ordered limit on poll_ts.
+        # Also covers plain poll_code lookups as a prefix
+        self._poll_code_ts_index = poll_code_ts_index = sa.Index(
+            f"ix_{data_provider.POLL_LOG_TABLE}_poll_code_poll_ts",
+            poll_log_table.c.poll_code,
+            poll_log_table.c.poll_ts,
         )
 
         self._user_data_table = user_data_table = sa.Table(
@@ -361,50 +578,84 @@ class SQLLiteConnection(DataConnection):
             meta,
             sa.Column("category", sa.String, primary_key=True, index=True, unique=True, nullable=False),
             sa.Column("data", BLOB, nullable=False),
-            sa.Column("created_ts", sa.TIMESTAMP(timezone=True), nullable=False),
-            sa.Column("updated_ts", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("created_ts", sa.BigInteger, nullable=False),
+            sa.Column("updated_ts", sa.BigInteger, nullable=False),
         )
 
-        with engine.connect() as conn:
-            poll_log_table.create(conn, checkfirst=True)
-            user_data_table.create(conn, checkfirst=True)
+        with data_provider._initialized_dbs_lock:
+            if user_id not in data_provider._initialized_dbs:
+                with engine.begin() as conn:
+                    poll_log_table.create(conn, checkfirst=True)
+                    user_data_table.create(conn, checkfirst=True)
+                    # Table creation is skipped for existing databases, so make sure they get the index as well
+                    poll_code_ts_index.create(conn, checkfirst=True)
+
+                    version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+                    if version < self.SCHEMA_VERSION:
+                        self._migrate(conn, version)
+                        conn.exec_driver_sql(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+                data_provider._initialized_dbs.add(user_id)
+
+        # Statements are built once and executed with bound parameters, so per-call work is limited to
+        # binding values (compiled SQL is reused from the engine's compiled cache)
+        # Insert statements per poll_code with the code and a single shared timestamp pre-bound
+        self._insert_log_stmts: Dict[str, Insert] = {}
+        self._update_log_stmt = poll_log_table.update().where(poll_log_table.c.id == sa.bindparam("log_id"))
+        # Log queries select exactly (id, poll_code, poll_ts, log), so rows can be unpacked positionally
+        self._log_columns = (
+            poll_log_table.c.id,
+            poll_log_table.c.poll_code,
+            poll_log_table.c.poll_ts,
+            poll_log_table.c.log,
+        )
+        self._select_logs_by_ids_stmt = sa.select(*self._log_columns).where(  # type: ignore
+            poll_log_table.c.id.in_(sa.bindparam("ids", expanding=True))
+        )
+        # get_poll_logs statements keyed by which of (poll_code, date_from, date_to, max_rows) filters are set
+        self._poll_logs_stmts: Dict[Tuple[bool, bool, bool, bool], Select] = {}
 
-    def store_user_data(self, data: str, category: str) -> bool:
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        self._select_user_data_stmt = sa.select(user_data_table.c.data).where(  # type: ignore
+            user_data_table.c.category == sa.bindparam("data_category")
+        )
+        self._insert_user_data_stmt = user_data_table.insert()
+        self._update_user_data_stmt = user_data_table.update().where(
+            user_data_table.c.category == sa.bindparam("data_category")
+        )
 
-        stmt = self._user_data_table.select().where(self._user_data_table.c.category == category)
-        new = True
-        with self._engine.connect() as conn:
-            row = conn.execute(stmt).first()
+    def _migrate(self, conn: sa.engine.Connection, version: int) -> None:
+        table = self._poll_log_table
 
-            if row:
-                new = False
+        if version < 1:
+            # Logs written before the format byte was introduced are stored as is, mark them as raw
+            encr = self._encryption_provider
+            rows = [
+                {"log_id": id, "log": encr.encrypt(_LOG_FORMAT_RAW + encr.decrypt(log))}
+                for id, log in conn.execute(sa.select(table.c.id, table.c.log))  # type: ignore
+            ]
 
-        stmt = None
+            if rows:
+                conn.execute(table.update().where(table.c.id == sa.bindparam("log_id")), rows)
 
-        data_out = self._encryption_provider.encrypt(data.encode())
+    def store_user_data(self, data: str | bytes, category: str) -> bool:
+        now = _now_us()
 
-        if new:
-            stmt = self._user_data_table.insert(
-                values={
-                    "data": data_out,
-                    "category": category,
-                    "created_ts": now,
-                    "updated_ts": now,
-                }
-            )
-        else:
-            stmt = self._user_data_table.update(
-                values={
-                    "data": data_out,
-                    "category": category,
-                    "created_ts": now,
-                    "updated_ts": now,
-                }
-            ).where(self._user_data_table.c.category == category)
+        data_out = self._encryption_provider.encrypt(_to_bytes(data))
 
-        with self._engine.connect() as conn:
-            result = conn.execute(stmt)
+        values = {
+            "data": data_out,
+            "category": category,
+            "created_ts": now,
+            "updated_ts": now,
+        }
+
+        with self._engine.begin() as conn:
+            row = conn.execute(self._select_user_data_stmt, {"data_category": category}).first()
+
+            if not row:
+                result = conn.execute(self._insert_user_data_stmt, values)
+            else:
+                result = conn.execute(self._update_user_data_stmt, values | {"data_category": category})
 
             if result.rowcount == 1:
                 return True
@@ -412,10 +663,8 @@ class SQLLiteConnection(DataConnection):
                 return False
 
     def get_user_data(self, category: str) -> str | None:
-        stmt = sa.select(self._user_data_table.c.data).where(self._user_data_table.c.category == category)  # type: ignore
-
         with self._engine.connect() as conn:
-            result = conn.execute(stmt)
+            result = conn.execute(self._select_user_data_stmt, {"data_category": category})
             data = result.scalar()
 
             if data:
@@ -423,73 +672,142 @@ class SQLLiteConnection(DataConnection):
             else:
                 return None
 
-    def append_log(self, poll_code: str, poll_ts: datetime.datetime, log: str) -> int | None:
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
+    def append_log(self, poll_code: str, poll_ts: datetime.datetime, log: str | bytes) -> int | None:
+        now = _now_us()
 
-        log_out = self._encryption_provider.encrypt(log.encode())
+        log_out = self._encryption_provider.encrypt(_pack_log(_to_bytes(log)))
 
-        stmt = self._poll_log_table.insert(
-            values={
-                "log": log_out,
-                "poll_code": poll_code,
-                "poll_ts": arrow.get(poll_ts).to("utc").datetime,
-                "created_ts": now,
-                "updated_ts": now,
-            }
-        )
+        params = {
+            "log": log_out,
+            "poll_ts": arrow.get(poll_ts).to("utc").datetime,
+            "ts": now,
+        }
 
-        with self._engine.connect() as conn:
-            result = conn.execute(stmt)
+        with self._engine.begin() as conn:
+            result = conn.execute(self._get_insert_log_stmt(poll_code), params)
 
             if result.rowcount == 1:
                 return result.inserted_primary_key[0]
             else:
                 return None
 
-    def _query_and_decrypt(self, stmt: Select) -> List[Tuple[int, str, datetime.datetime, str]]:
-        ret = []
+    def _get_insert_log_stmt(self, poll_code: str) -> Insert:
+        stmt = self._insert_log_stmts.get(poll_code)
+
+        if stmt is None:
+            ts = sa.bindparam("ts")
+            stmt = self._insert_log_stmts[poll_code] = self._poll_log_table.insert().values(
+                poll_code=poll_code, created_ts=ts, updated_ts=ts
+            )
+
+        return stmt
+
+    def append_logs(self, poll_code: str, logs: List[Tuple[datetime.datetime, str | bytes]]) -> int:
+        if not logs:
+            return 0
+
+        now = _now_us()
+        encrypt = self._encryption_provider.encrypt
+
+        rows = [
+            {
+                "log": encrypt(_pack_log(_to_bytes(log))),
+                "poll_ts": arrow.get(poll_ts).to("utc").datetime,
+                "ts": now,
+            }
+            for poll_ts, log in logs
+        ]
+
+        # Single executemany inside one transaction => one commit for the whole batch
+        with self._engine.begin() as conn:
+            result = conn.execute(self._get_insert_log_stmt(poll_code), rows)
+
+        return result.rowcount
+
+    def _iter_query_and_decrypt(
+        self, stmt: Select, params: Dict[str, Any] | None = None
+    ) -> Iterator[Tuple[int, str, datetime.datetime, str]]:
+        decrypt_many = self._encryption_provider.decrypt_many
+
         with self._engine.connect() as conn:
-            result = conn.execute(stmt)
-
-            rows = result.all()
-            for row in rows:
-                ret.append(
-                    (
-                        row["id"],
-                        row["poll_code"],
-                        row["poll_ts"],
-                        self._encryption_provider.decrypt(row["log"]).decode(),
-                    )
-                )
+            result = conn.execution_options(yield_per=self.YIELD_PER).execute(stmt, params or {})
 
-        return ret
+            # Rows are fetched and decrypted in batches of `YIELD_PER`, so only one batch is held in memory
+            for rows in result.partitions():
+                logs = decrypt_many(row[3] for row in rows)
+
+                for (id, poll_code, poll_ts, _), log in zip(rows, logs):
+                    yield (id, poll_code, poll_ts, _unpack_log(log).decode())
+
+    def _query_and_decrypt(
+        self, stmt: Select, params: Dict[str, Any] | None = None
+    ) -> List[Tuple[int, str, datetime.datetime, str]]:
+        with self._engine.connect() as conn:
+            rows = conn.execute(stmt, params or {}).all()
+
+        logs = self._encryption_provider.decrypt_many(row[3] for row in rows)
+        unpack = _unpack_log
+
+        return [(id, poll_code, poll_ts, unpack(log).decode()) for (id, poll_code, poll_ts, _), log in zip(rows, logs)]
 
     def get_logs(
         self,
         ids: List[int],
     ) -> List[Tuple[int, str, datetime.datetime, str]]:
-        stmt = self._poll_log_table.select().where(self._poll_log_table.c.id.in_(ids))
+        stmt = self._select_logs_by_ids_stmt
+        chunk = self.MAX_BIND_PARAMS
+
+        if len(ids) <= chunk:
+            return self._query_and_decrypt(stmt, {"ids": ids})
 
-        return self._query_and_decrypt(stmt)
+        # Stay below SQLite's limit on the number of bound parameters per statement
+        ret = []
+        for i in range(0, len(ids), chunk):
+            ret.extend(self._query_and_decrypt(stmt, {"ids": ids[i : i + chunk]}))
+
+        return ret
 
-    def update_log(self, id: Any, poll_ts: datetime.datetime | None = None, log: str | None = None) -> bool:
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
+    def update_log(self, id: Any, poll_ts: datetime.datetime | None = None, log: str | bytes | None = None) -> bool:
+        now = _now_us()
 
-        stmt = self._poll_log_table.update().where(self._poll_log_table.c.id == id).values(updated_ts=now)
+        # SET clause is derived from the parameter keys
+        params: Dict[str, Any] = {"log_id": id, "updated_ts": now}
         if log is not None:
-            log_out = self._encryption_provider.encrypt(log.encode())
-            stmt = stmt.values(log=log_out)
+            params["log"] = self._encryption_provider.encrypt(_pack_log(_to_bytes(log)))
         if poll_ts is not None:
-            stmt = stmt.values(poll_ts=arrow.get(poll_ts).to("utc").datetime)
+            params["poll_ts"] = arrow.get(poll_ts).to("utc").datetime
 
-        with self._engine.connect() as conn:
-            result = conn.execute(stmt)
+        with self._engine.begin() as conn:
+            result = conn.execute(self._update_log_stmt, params)
 
             if result.rowcount == 1:
                 return True
             else:
                 return False
 
+    def update_logs(self, logs: List[Tuple[int, datetime.datetime, str | bytes]]) -> int:
+        if not logs:
+            return 0
+
+        # One timestamp and one transaction for the whole batch
+        now = _now_us()
+        encrypt = self._encryption_provider.encrypt
+
+        rows = [
+            {
+                "log_id": id,
+                "log": encrypt(_pack_log(_to_bytes(log))),
+                "poll_ts": arrow.get(poll_ts).to("utc").datetime,
+                "updated_ts": now,
+            }
+            for id, poll_ts, log in logs
+        ]
+
+        with self._engine.begin() as conn:
+            result = conn.execute(self._update_log_stmt, rows)
+
+        return result.rowcount
+
     def get_poll_logs(
         self,
         poll_code: str | None = None,
@@ -498,23 +816,68 @@ class SQLLiteConnection(DataConnection):
         max_rows: int | None = None,
         skip: int | None = None,
     ) -> List[Tuple[int, str, datetime.datetime, str]]:
+        stmt, params = self._poll_logs_query(poll_code, date_from, date_to, max_rows, skip)
+
+        return self._query_and_decrypt(stmt, params)[skip or 0 :]
+
+    def iter_poll_logs(
+        self,
+        poll_code: str | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+        max_rows: int | None = None,
+        skip: int | None = None,
+    ) -> Iterator[Tuple[int, str, datetime.datetime, str]]:
+        stmt, params = self._poll_logs_query(poll_code, date_from, date_to, max_rows, skip)
+
+        return itertools.islice(self._iter_query_and_decrypt(stmt, params), skip or 0, None)
+
+    def _poll_logs_query(
+        self,
+        poll_code: str | None,
+        date_from: datetime.datetime | None,
+        date_to: datetime.datetime | None,
+        max_rows: int | None,
+        skip: int | None,
+    ) -> Tuple[Select, Dict[str, Any]]:
         if not skip:
             skip = 0
 
-        stmt = self._poll_log_table.select()
+        params: Dict[str, Any] = {}
 
         if poll_code:
-            stmt = stmt.where(self._poll_log_table.c.poll_code == poll_code)
+            params["poll_code"] = poll_code
 
         if date_from:
-            stmt = stmt.where(self._poll_log_table.c.poll_ts >= arrow.get(date_from).to("utc").datetime)
+            params["date_from"] = arrow.get(date_from).to("utc").datetime
 
         if date_to:
-            stmt = stmt.where(self._poll_log_table.c.poll_ts <= arrow.get(date_to).to("utc").datetime)
+            params["date_to"] = arrow.get(date_to).to("utc").datetime
 
         if max_rows:
-            stmt = stmt.limit(max_rows + skip)
+            params["limit"] = max_rows + skip
+
+        key = (bool(poll_code), bool(date_from), bool(date_to), bool(max_rows))
+        stmt = self._poll_logs_stmts.get(key)
+        if stmt is None:
+            stmt = self._poll_logs_stmts[key] = self._build_poll_logs_stmt(*key)
+
+        return stmt, params
 
-        stmt = stmt.order_by(self._poll_log_table.c.poll_ts.desc())
+    def _build_poll_logs_stmt(self, poll_code: bool, date_from: bool, date_to: bool, max_rows: bool) -> Select:
+        table = self._poll_log_table
+        stmt = sa.select(*self._log_columns)  # type: ignore
+
+        if poll_code:
+            stmt = stmt.where(table.c.poll_code == sa.bindparam("poll_code"))
+
+        if date_from:
+            stmt = stmt.where(table.c.poll_ts >= sa.bindparam("date_from"))
+
+        if date_to:
+            stmt = stmt.where(table.c.poll_ts <= sa.bindparam("date_to"))
+
+        if max_rows:
+            stmt = stmt.limit(sa.bindparam("limit"))
 
-        return self._query_and_decrypt(stmt)[skip:]
+        return stmt.order_by(table.c.poll_ts.desc())
@@ -1,3 +1,4 @@
+from nerddiary.data import crypto
 from nerddiary.data.crypto import EncryptionProdiver
 
 import pytest
@@ -68,3 +69,57 @@ class TestEncryptionProdiver:
         assert err.type == ValueError and err.value.args == (
             "`password_or_key` must be either a `str` password ot `bytes` key",
         )
+
+    def test_key_derivation_cache(self, monkeypatch):
+        password = "test password"
+
+        encr = EncryptionProdiver(password)
+        encrypted = encr.encrypt(b"test data")
+
+        # Reopening must not run the KDF again
+        def _fail(*args, **kwargs):
+            raise AssertionError("Key derived twice")
+
+        monkeypatch.setattr(crypto, "PBKDF2HMAC", _fail)
+        assert EncryptionProdiver(password, init_token=encrypted).key == encr.key
+
+        assert all(password.encode() not in cache_key for cache_key in crypto._key_cache)
+
+    def test_legacy_token(self):
+        from base64 import urlsafe_b64decode as b64d
+        from base64 import urlsafe_b64encode as b64e
+
+        password = "test password"
+        test_data = b"test data"
+
+        encr = EncryptionProdiver(password)
+        encrypted = encr.encrypt(test_data)
+
+        # Tokens written by older versions had no version byte and were base64 encoded as a whole
+        legacy = b64e(encrypted[1:21] + b64d(encrypted[21:]))
+
+        assert encr.decrypt(legacy) == test_data
+        assert EncryptionProdiver(password, init_token=legacy, control_message=test_data).decrypt(encrypted) == test_data
+
+    def test_large_iterations(self, monkeypatch):
+        # Iteration counts with a non-zero high byte don't affect telling binary and legacy tokens apart
+        monkeypatch.setattr(crypto, "ITERATIONS", 2**24 + 1)
+        # Skip running the KDF that many times, the key itself doesn't matter here
+        monkeypatch.setattr(crypto, "_derive_key", lambda password, salt, iterations: crypto.Fernet.generate_key())
+
+        encr = EncryptionProdiver("test password")
+        encrypted = encr.encrypt(b"test data")
+
+        assert crypto._split_token(encrypted)[:2] == (encr.salt, 2**24 + 1)
+        assert encr.decrypt(encrypted) == b"test data"
+
+    def test_decrypt_many(self):
+        encr = EncryptionProdiver("test password")
+        messages = [b"one", b"two", b"three"]
+
+        assert encr.decrypt_many([encr.encrypt(m) for m in messages]) == messages
+
+        encr2 = EncryptionProdiver("test password")
+        with pytest.raises(ValueError) as err:
+            encr.decrypt_many([encr.encrypt(b"one"), encr2.encrypt(b"two")])
+        assert err.type == ValueError and err.value.args == ("Salt or iterations mismatch",)
@@ -3,6 +3,7 @@ import itertools
 import json
 import random
 import time
+from operator import itemgetter
 from pathlib import Path
 
 from nerddiary.data.crypto import EncryptionProdiver
@@ -20,10 +21,10 @@ from nerddiary.user.user import User
 
 import pytest
 import sqlalchemy as sa
-from pydantic import ValidationError
 from sqlalchemy.dialects.sqlite import BLOB
 
 
+@pytest.mark.usefixtures("fast_kdf")
 class TestDataProvider:
     def test_abstract(self):
         with pytest.raises(TypeError, match=r"Can't instantiate abstract class.*"):
@@ -38,7 +39,7 @@ class TestDataProvider:
 
         dp = DataProvider.get_data_provider(test_provider, test_params)
         assert isinstance(dp, SQLLiteProvider)
-        assert dp._params == SQLLiteProviderParams.parse_obj(test_params)
+        assert dp._params == SQLLiteProviderParams(base_path=Path(test_params["base_path"]))
 
         with pytest.raises(NotImplementedError) as err:
             DataProvider.validate_params("non_existent_provider", {"base_path_missplled": "test"})
@@ -143,12 +144,15 @@ class TestSQLLiteProvider:
         assert not DataProvider.validate_params("sqllite", {"base_path_missplled": "test"})
 
         # Incorrect params
-        with pytest.raises(ValidationError) as err:
+        with pytest.raises(ValueError) as err:
             DataProvider.get_data_provider("sqllite", {"base_path_missplled": "test"})
-        assert err.type == ValidationError
+        assert err.type == ValueError
 
         # Correct params
         data_path: Path = tmp_path_factory.mktemp("data")
+        assert not DataProvider.validate_params("sqllite", {"base_path": str(data_path / "missing")})
+        assert not DataProvider.validate_params("sqllite", {"base_path": str(data_path), "extra": "param"})
+
         provider = DataProvider.get_data_provider("sqllite", {"base_path": str(data_path)})
 
         assert isinstance(provider, SQLLiteProvider)
@@ -173,6 +177,7 @@ class TestSQLLiteProvider:
         assert provider.get_lock(user_id=mockuser_id) == b"test lock"
 
 
+@pytest.mark.usefixtures("fast_kdf")
 class TestSQLLiteConnection:
     def test_config(self, mockuser, test_data_provider):
         assert isinstance(mockuser, User)
@@ -199,7 +204,7 @@ class TestSQLLiteConnection:
             config_data_encrypted = result.scalar()
 
         # Validate data was encrypted
-        assert config_data_encrypted.decode() != config
+        assert config_data_encrypted != config.encode()
 
         # Check correct loading of the config back
         assert conn.get_user_data(category="config") == config
@@ -245,11 +250,11 @@ class TestSQLLiteConnection:
             test_data_provider.POLL_LOG_TABLE,
             meta,
             sa.Column("id", sa.Integer, primary_key=True, index=True, nullable=False),
-            sa.Column("poll_code", sa.String, index=True, unique=False, nullable=False),
+            sa.Column("poll_code", sa.String, unique=False, nullable=False),
             sa.Column("poll_ts", sa.TIMESTAMP(timezone=True), index=True, unique=False, nullable=False),
             sa.Column("log", BLOB, nullable=False),
-            sa.Column("created_ts", sa.TIMESTAMP(timezone=True), nullable=False),
-            sa.Column("updated_ts", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("created_ts", sa.BigInteger, nullable=False),
+            sa.Column("updated_ts", sa.BigInteger, nullable=False),
         )
 
         # Check data is indeed encrypted
@@ -259,12 +264,13 @@ class TestSQLLiteConnection:
 
             rows = result.all()
             for row in rows:
-                assert row["log"].decode() not in poll_1_values
+                assert row["log"] not in [value.encode() for value in poll_1_values]
 
         # Check get_all_logs
         all_logs = conn.get_all_logs()
         assert len(all_logs) == len(poll_1_values) + len(poll_2_values)
-        assert set(map(lambda x: x[3], all_logs)) == set(poll_1_values + poll_2_values)
+        assert set(map(itemgetter(3), all_logs)) == set(poll_1_values + poll_2_values)
+        assert list(conn.iter_all_logs()) == all_logs
 
         # Check get_last_n_logs
         test_logs = conn.get_last_n_logs(1, poll_code="unknown_poll")
@@ -281,7 +287,7 @@ class TestSQLLiteConnection:
         test_logs = conn.get_last_n_logs(5, poll_code=poll_code_1)
         assert len(test_logs) == 5
 
-        test_ids = list(map(lambda x: x[0], test_logs))
+        test_ids = list(map(itemgetter(0), test_logs))
 
         assert conn.get_logs(test_ids) == list(
             zip(test_ids, itertools.repeat(poll_code_1), poll_1_poll_tss, poll_1_values)
@@ -302,12 +308,18 @@ class TestSQLLiteConnection:
         )
         assert len(test_logs) == 1
 
-        test_ids = list(map(lambda x: x[0], test_logs))
+        test_ids = list(map(itemgetter(0), test_logs))
 
         assert conn.get_logs(test_ids) == list(
             zip(test_ids, itertools.repeat(poll_code_1), poll_1_poll_tss, poll_1_values)
         )
 
+        # Check iter_poll_logs
+        assert list(conn.iter_poll_logs(poll_code_1, max_rows=3, skip=2)) == conn.get_poll_logs(
+            poll_code_1, max_rows=3, skip=2
+        )
+        assert len(list(conn.iter_poll_logs(poll_code_1, max_rows=3, skip=2))) == 3
+
         # Check get_poll_logs
         test_logs = conn.get_poll_logs(
             poll_code_1,
@@ -339,21 +351,135 @@ class TestSQLLiteConnection:
 
             rows = result.all()
             for row in rows:
-                assert row["log"].decode() != "new data"
+                assert row["log"] != b"new data"
+
+    def test_append_logs(self, test_data_provider):
+        assert isinstance(test_data_provider, SQLLiteProvider)
+
+        conn = test_data_provider.get_connection("append_logs", "password")
+        assert isinstance(conn, SQLLiteConnection)
+
+        assert conn.append_logs("poll", []) == 0
+
+        now = datetime.datetime.now()
+        logs = [(now - datetime.timedelta(days=i), "log" + str(i)) for i in range(5)]
+
+        assert conn.append_logs("poll", logs) == len(logs)
+
+        test_logs = conn.get_poll_logs("poll")
+        assert [(poll_ts, log) for _, _, poll_ts, log in test_logs] == logs
+
+        # Large id lists are queried in chunks
+        conn.MAX_BIND_PARAMS = 2
+        assert conn.get_logs([id for id, _, _, _ in test_logs]) == sorted(test_logs)
+
+        # Batched updates
+        assert conn.update_logs([]) == 0
+        updated = [(id, poll_ts - datetime.timedelta(days=10), log + "_updated") for id, _, poll_ts, log in test_logs]
+        assert conn.update_logs(updated) == len(updated)
+        assert [(id, poll_ts, log) for id, _, poll_ts, log in conn.get_logs([id for id, _, _ in updated])] == updated
+
+        # Large logs are compressed before encryption and read back transparently
+        big_log = json.dumps([{"question": "q" + str(i), "answer": "answer"} for i in range(100)])
+        id = conn.append_log("big_poll", now, big_log)
+        assert conn.get_log(id)[3] == big_log
+
+        # bytes payloads are stored as is and read back as text
+        id = conn.append_log("bytes_poll", now, "bytes log".encode())
+        assert conn.get_log(id)[3] == "bytes log"
+
+    def test_shared_engine(self, test_data_provider):
+        conn = test_data_provider.get_connection("shared_engine", "password")
+        other = test_data_provider.get_connection("shared_engine", "password")
+
+        now = datetime.datetime.now()
+        conn.append_logs("poll", [(now - datetime.timedelta(days=i), "log" + str(i)) for i in range(5)])
+
+        # Other calls made while a result is still being iterated get their own DB connection
+        ret = []
+        for id, _, poll_ts, log in conn.iter_poll_logs("poll"):
+            ret.append(log)
+            assert conn.get_log(id)[3] == log
+            conn.update_log(id, poll_ts, log)
+
+        assert ret == ["log" + str(i) for i in range(5)]
+
+        # Closing one connection doesn't affect others of the same user
+        conn.close()
+        assert len(other.get_poll_logs("poll")) == 5
+
+        # Provider stays usable after releasing its pooled connections
+        test_data_provider.close()
+        assert len(other.get_poll_logs("poll")) == 5
+
+    def test_recreated_db(self, test_data_provider):
+        conn = test_data_provider.get_connection("recreated_db", "password")
+        conn.store_user_data("config", category="config")
+
+        # Database (and the whole user dir) removed while the provider is alive
+        user_dir, db_path, lock_path = test_data_provider._user_paths("recreated_db")
+        for path in user_dir.iterdir():
+            path.unlink()
+        user_dir.rmdir()
+
+        conn = test_data_provider.get_connection("recreated_db", "password")
+        assert db_path.is_file() and lock_path.is_file()
+        assert conn.get_user_data(category="config") is None
+        assert conn.store_user_data("config", category="config")
+
+        # Another provider with the same base path verifies the schema on its own
+        other = SQLLiteProvider({"base_path": str(test_data_provider._params.base_path)})
+        assert other.get_connection("recreated_db", "password").get_user_data(category="config") == "config"
+
+    def test_legacy_logs(self, test_data_provider):
+        conn = test_data_provider.get_connection("legacy_logs", "password")
+        now = datetime.datetime.now()
+
+        # Rows written before schema version 1 have no format byte, and any payload is possible
+        legacy_logs = ["\x01legacy log", "\x00legacy log", "legacy log"]
+        _, db_path, _ = test_data_provider._user_paths("legacy_logs")
+        engine = sa.create_engine(SQLLiteProvider.BASE_URI + str(db_path))
+        with engine.begin() as db:
+            legacy_ids = [
+                db.execute(
+                    sa.text(
+                        f"INSERT INTO {test_data_provider.POLL_LOG_TABLE} "
+                        "(poll_code, poll_ts, log, created_ts, updated_ts) VALUES ('poll', :poll_ts, :log, 0, 0)"
+                    ),
+                    {"poll_ts": now, "log": conn._encryption_provider.encrypt(log.encode())},
+                ).lastrowid
+                for log in legacy_logs
+            ]
+            db.exec_driver_sql("PRAGMA user_version=0")
+        engine.dispose()
+
+        # Legacy rows are migrated on first open by a provider
+        provider = SQLLiteProvider({"base_path": str(test_data_provider._params.base_path)})
+        conn = provider.get_connection("legacy_logs", "password")
+        assert [log for _, _, _, log in conn.get_logs(legacy_ids)] == legacy_logs
+
+        id = conn.append_log("poll", now, "new log")
+        assert conn.get_log(id)[3] == "new log"
+
+        with conn._engine.connect() as db:
+            assert db.exec_driver_sql("PRAGMA user_version").scalar() == SQLLiteConnection.SCHEMA_VERSION
 
     def test_performance(self, test_data_connection):
+        now = datetime.datetime.now()
+        logs = [
+            (now - datetime.timedelta(minutes=i), json.dumps([i, random.randrange(1, i * 100)])) for i in range(1, 2500)
+        ]
+
         start_time = time.time()
 
-        for i in range(1, 2500):
-            log = json.dumps([i, random.randrange(1, i * 100)])
-            test_data_connection.append_log("headache", log)
+        test_data_connection.append_logs("headache", logs)
 
         runtime = time.time() - start_time
         assert runtime < 5, f"Real runtime: {runtime}"
 
         start_time = time.time()
 
-        test_data_connection.get_last_logs("headache", datetime.datetime.now() - datetime.timedelta(days=3), 10)
+        test_data_connection.get_poll_logs("headache", date_from=now - datetime.timedelta(days=3), max_rows=10)
 
         runtime = time.time() - start_time
         assert runtime < 5, f"Real runtime: {runtime}"
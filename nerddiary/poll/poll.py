@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import datetime
-import itertools
 import logging
 import re
 
@@ -12,10 +11,13 @@ from pydantic.fields import Field, PrivateAttr
 
 from .question import Question
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 logger = logging.getLogger(__name__)
 
+_COMMAND_RE = re.compile(r"^[\da-z_]{1,32}$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 class Poll(BaseModel):
     """Represents a single poll"""
@@ -53,63 +55,53 @@ class Poll(BaseModel):
 
         # Strip whitespace
         if self.command:
-            self.command.strip()
+            self.command = self.command.strip()
 
         # Try auto assign command from name
-        if not self.command and re.match(r"^[\da-z_]{1,32}$", re.sub(r"\s+", "_", self.poll_name.lower())):
-            self.command = re.sub(r"\s+", "_", self.poll_name.lower())
+        if not self.command:
+            command = _WHITESPACE_RE.sub("_", self.poll_name.lower())
+            if _COMMAND_RE.match(command):
+                self.command = command
 
         # Create help mappings for workflow processing
-        self._questions_dict = {}
-        for q, order in zip(self.questions, itertools.count()):
+        self._questions_dict = {q.code: q for q in self.questions}
+        for order, q in enumerate(self.questions):
             q._order = order
-            self._questions_dict |= {q.code: q}
-
-    @validator("questions")
-    def question_codes_must_be_unique(cls, v: List[Question]):
-        if v:
-            q_codes = [q.code for q in v]
-            q_codes_set = set(q_codes)
-            if len(q_codes_set) != len(q_codes):
-                raise ValueError("Question codes must be unique")
-        return v
 
     @validator("questions")
-    def dependant_question_must_exist_and_support_type(cls, v: List[Question]):
-        # Check that dependant question exists and has already been processed (comes earlier)
-        previous = []
-        q_dict: Dict[str, Question] = {}
-        for q in v:
-            q_dict |= {q.code: q}
-
-        for code, question in q_dict.items():
-            if question.depends_on:
-                if question.depends_on not in previous:
+    def question_codes_must_be_unique_and_dependencies_valid(cls, v: List[Question]):
+        q_dict: Dict[str, Question] = {q.code: q for q in v}
+        if len(q_dict) != len(v):
+            raise ValueError("Question codes must be unique")
+
+        # Check that dependant question exists and has already been processed (comes earlier).
+        # Ephemeral dependencies are reported only if all questions pass the checks above
+        previous: Set[str] = set()
+        ephemeral_error: str | None = None
+
+        for question in v:
+            depends_on = question.depends_on
+            if depends_on:
+                if depends_on not in previous:
                     raise ValueError(
-                        f"Question <{question.display_name}> depends on <{question.depends_on}> which is either not defined, or goes after this question"
+                        f"Question <{question.display_name}> depends on <{depends_on}> which is either not defined, or goes after this question"
                     )
 
-                if not question._type.check_dependency_type(q_dict[question.depends_on]._type):  # type: ignore
+                dependency = q_dict[depends_on]
+                if not question._type.check_dependency_type(dependency._type):  # type: ignore
                     raise ValueError(
-                        f"Question <{question.display_name}> is of type that is not compatible with the dependcy question <{question.depends_on}>"
+                        f"Question <{question.display_name}> is of type that is not compatible with the dependcy question <{depends_on}>"
                     )
 
-            previous.append(code)
+                if ephemeral_error is None and dependency.ephemeral:
+                    ephemeral_error = (
+                        f"Question <{question.display_name}> can not depend on an ephemeral question <{depends_on}>"
+                    )
 
-        return v
+            previous.add(question.code)
 
-    @validator("questions")
-    def dependant_question_cannot_depend_on_ephemeral(cls, v: List[Question]):
-        q_dict: Dict[str, Question] = {}
-        for q in v:
-            q_dict |= {q.code: q}
-
-        for question in q_dict.values():
-            if question.depends_on:
-                if q_dict[question.depends_on].ephemeral:
-                    raise ValueError(
-                        f"Question <{question.display_name}> can not depend on an ephemeral question <{question.depends_on}>"
-                    )
+        if ephemeral_error is not None:
+            raise ValueError(ephemeral_error)
 
         return v
 
@@ -132,11 +124,8 @@ class Poll(BaseModel):
 
     @validator("questions")
     def skipped_questions_must_have_default_value(cls, v: List[Question]):
-        q_dict: Dict[str, Question] = {}
-        for q in v:
-            q_dict |= {q.code: q}
-
-        for question, index in zip(q_dict.values(), itertools.count()):
+        # Codes are unique at this point, so list order matches the questions order
+        for index, question in enumerate(v):
             if question.skip_on:
                 for skip_to_code in question.skip_on.values():
                     for skip_i in range(index + 1, len(v)):
@@ -152,11 +141,7 @@ class Poll(BaseModel):
 
     @validator("questions")
     def skip_to_question_must_follow_skipped(cls, v: List[Question]):
-        q_dict: Dict[str, Question] = {}
-        for q in v:
-            q_dict |= {q.code: q}
-
-        for question, index in zip(q_dict.values(), itertools.count()):
+        for index, question in enumerate(v):
             if question.skip_on:
                 dest_q = set(question.skip_on.values())
                 following_q = set([v[skip_i].code for skip_i in range(index + 1, len(v))])
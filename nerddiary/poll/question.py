@@ -99,7 +99,7 @@ class Question(BaseModel):
             pos_values = type.get_possible_values()
 
             if isinstance(pos_values, list):
-                serialized_pos_values = list(map(type.serialize_value, pos_values))
+                serialized_pos_values = set(map(type.serialize_value, pos_values))
                 if any(delay_value not in serialized_pos_values for delay_value in v):
                     raise ValueError(f"`dalay_on` value doesn't exist for the type {type.__class__}")
             else:
@@ -124,7 +124,7 @@ class Question(BaseModel):
             pos_values = type.get_possible_values()
 
             if isinstance(pos_values, list):
-                serialized_pos_values = list(map(type.serialize_value, pos_values))
+                serialized_pos_values = set(map(type.serialize_value, pos_values))
                 if v not in serialized_pos_values:
                     raise ValueError(f"`default_value` value doesn't exist for the type {type.__class__}")
             else:
@@ -149,7 +149,7 @@ class Question(BaseModel):
             pos_values = type.get_possible_values()
 
             if isinstance(pos_values, list):
-                serialized_pos_values = list(map(type.serialize_value, pos_values))
+                serialized_pos_values = set(map(type.serialize_value, pos_values))
                 if any(delay_value not in serialized_pos_values for delay_value in v):
                     raise ValueError(f"`skip_on` value doesn't exist for the type {type.__class__}")
             else:
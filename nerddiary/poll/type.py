@@ -156,11 +156,15 @@ class DependantSelectType(QuestionType):
 
     select: t.Dict[str, conlist(ValueLabel[str], min_items=1)]  # type:ignore
 
+    _possible_values: t.List[ValueLabel] = PrivateAttr(default=[])
+    """ All select options flattened, computed once on init """
+
     def __init__(self, **data):
         super().__init__(**data)
 
         self._auto = False
         self._must_depend = True
+        self._possible_values = [vl for value_list in self.select.values() for vl in value_list]
 
     @validator("select")
     def at_least_one_select_must_exist(cls, v: t.Dict[str, t.Any]):
@@ -169,11 +173,7 @@ class DependantSelectType(QuestionType):
         return v
 
     def get_possible_values(self) -> t.List[ValueLabel]:
-        ret = []
-        for value_list in self.select.values():
-            ret += value_list
-
-        return ret
+        return self._possible_values
 
     def get_value_from_answer(
         self, answer: str, dep_value: ValueLabel[str] | None = None, user: User | None = None
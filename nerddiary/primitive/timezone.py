@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 import datetime
+import functools
 
 import pytz
 
 
+@functools.lru_cache(maxsize=512)
+def _get_timezone(zone: str) -> datetime.tzinfo:
+    return pytz.timezone(zone)
+
+
 class TimeZone(datetime.tzinfo):  # pragma: no cover
     """Custom pydantic type wrapper for timezone"""
 
@@ -30,7 +36,7 @@ class TimeZone(datetime.tzinfo):  # pragma: no cover
 
         if isinstance(v, str):
             try:
-                tz = pytz.timezone(v)
+                tz = _get_timezone(v)
             except pytz.UnknownTimeZoneError:
                 raise ValueError("invalid timezone code")
 
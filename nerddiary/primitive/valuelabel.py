@@ -16,16 +16,23 @@ class ValueLabel(GenericModel, Generic[ValueType]):
 
     @root_validator(pre=True)
     def check_and_convert_value_label_dict(cls, values: Dict[Any, Any]):
-        if len(values) > 2:  # pragma: no cover
+        num_values = len(values)
+
+        # Full {"value": value, "label": label} form - nothing to convert
+        if num_values == 2:
+            return values
+
+        if num_values > 2:  # pragma: no cover
             raise ValueError(
                 'Valuelabel may only be defined in either {"value": value, "label": label} or {"value": "label"} formats'
             )
 
-        if len(values) == 1 and "label" not in values and "value" not in values:
-            val, lab = next(iter(values.items()))
+        if num_values == 1:
+            ((val, lab),) = values.items()
 
-            assert isinstance(lab, str), "Label must be a string"
-            values = {"value": val, "label": lab}
+            if val != "label" and val != "value":
+                assert isinstance(lab, str), "Label must be a string"
+                return {"value": val, "label": lab}
 
         return values
 
@@ -14,7 +14,7 @@ session_router = r = APIRouter(prefix="/session")
 @r.get("/", response_model=t.List[UserSessionSchema], response_model_exclude_none=True)
 async def get_sessions():
     # TODO add proper logging
-    return [UserSessionSchema(user_id=ses.user_id, user_status=ses.user_status) for ses in nds._sessions.get_all()]
+    return [ses.to_schema() for ses in nds._sessions.get_all()]
 
 
 @r.get("/{user_id}", response_model=UserSessionSchema, response_model_exclude_none=True)
@@ -25,7 +25,7 @@ async def get_session(user_id: str):
     except NerdDiaryError as err:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f"{err!r}")
 
-    return UserSessionSchema(user_id=ses.user_id, user_status=ses.user_status)
+    return ses.to_schema()
 
 
 @r.post("/{user_id}/unlock", response_model=UserSessionSchema, response_model_exclude_none=True)
@@ -51,4 +51,4 @@ async def unlock_session(user_id: str, password: str | None = None, key: str | N
             raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail=err.message)
         raise HTTPException(status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=f"{err!r}")
 
-    return UserSessionSchema(user_id=ses.user_id, user_status=ses.user_status)
+    return ses.to_schema()
@@ -11,6 +11,9 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
     try:
         while True:
             data = await websocket.receive_text()
-            await nds.message_queue.put((client_id, data))
+            await nds.handle_message(client_id, data)
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Any other error ends this connection as well, so never leave a stale active connection behind
         await nds.on_disconnect_client(client_id)
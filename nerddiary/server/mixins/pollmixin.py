@@ -5,6 +5,7 @@ import datetime
 from jsonrpcserver import Error, InvalidParams, Result, Success, method
 
 from ...error.error import NerdDiaryError
+from ...utils import fastjson
 from ..proto import ServerProtocol
 from ..schema import PollExtendedSchema, PollLogsSchema, PollsSchema
 
@@ -259,7 +260,7 @@ class PollMixin:
 
         ret = 0
         try:
-            ret = await ses.log_poll_data(data=PollLogsSchema.parse_raw(poll_data))
+            ret = await ses.log_poll_data(data=PollLogsSchema.parse_obj(fastjson.loads(poll_data)))
         except NerdDiaryError as err:
             self._logger.debug(f"Error: {err!r}")
             return Error(err.code, err.message, err.data)
@@ -4,33 +4,32 @@ from __future__ import annotations
 
 import datetime
 import enum
-import json
 
 from pydantic import BaseModel
 from pydantic.json import pydantic_encoder
 
 from ..primitive.valuelabel import ValueLabel
+from ..utils import fastjson
 from .session.status import UserSessionStatus
 
 from typing import Dict, List, Tuple
 
 
 def generate_notification(type: NotificationType, data: Schema | None = None) -> str:
+    # Only the data part is serialized, the envelope prefix is precomputed per notification type
     if data:
-        return json.dumps(
-            {
-                "notification": str(type.value),
-                "data": {"schema": data.__class__.__name__, "data": data.dict()},
-            },
-            default=pydantic_encoder,
+        return (
+            _NOTIFICATION_PREFIXES[type]
+            + fastjson.dumps({"schema": data.__class__.__name__, "data": data.dict()}, default=pydantic_encoder)
+            + "}"
         )
     else:
-        return json.dumps(
-            {
-                "notification": str(type.value),
-                "data": None,
-            }
-        )
+        return _NOTIFICATION_PREFIXES[type] + "null}"
+
+
+def generate_notifications(notifications: List[Tuple[NotificationType, Schema | None]]) -> str:
+    """Serializes several notifications into a single message - a JSON array of notifications"""
+    return "[" + ",".join(generate_notification(type, data) for type, data in notifications) + "]"
 
 
 @enum.unique
@@ -47,6 +46,11 @@ class NotificationType(enum.IntEnum):
     CLIENT_ON_DISCONNECT = 205
 
 
+_NOTIFICATION_PREFIXES: Dict[NotificationType, str] = {
+    type: fastjson.dumps({"notification": str(type.value)})[:-1] + ',"data":' for type in NotificationType
+}
+
+
 class Schema(BaseModel):
     pass
 
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from contextlib import suppress
 from functools import partial
@@ -13,33 +12,45 @@ from pydantic.json import pydantic_encoder
 
 from ..asynctools.asyncapp import AsyncApplication
 from ..data.data import DataProvider
+from ..utils import fastjson
 from ..utils.sensitive import mask_sensitive
 from .config import NerdDiaryServerConfig
 from .mixins.pollmixin import PollMixin
 from .mixins.sessionmixin import SessionMixin
-from .schema import ClientSchema, NotificationType, Schema, UserSessionSchema, generate_notification
+from .schema import (
+    ClientSchema,
+    NotificationType,
+    Schema,
+    generate_notification,
+    generate_notifications,
+)
 from .session.session import SessionSpawner
 
-from typing import Dict, Set, Tuple
+from typing import AbstractSet, Dict, FrozenSet, List, Tuple
+
+_rpc_serializer = partial(fastjson.dumps, default=pydantic_encoder)
 
 
 class NerdDiaryServer(AsyncApplication, SessionMixin, PollMixin):
+    NOTIFICATION_BATCH_SIZE = 32
+
     def __init__(
         self,
-        config: NerdDiaryServerConfig = NerdDiaryServerConfig(),
+        config: NerdDiaryServerConfig | None = None,
         loop: asyncio.AbstractEventLoop | None = None,
         logger: logging.Logger = logging.getLogger(__name__),
     ) -> None:
         super().__init__(loop=loop, logger=logger)
 
-        self._config = config
+        # Default config is built lazily, so importing the module doesn't require the default data path to exist
+        self._config = config = config or NerdDiaryServerConfig()
 
         self._data_provider = DataProvider.get_data_provider(config.data_provider_name, config.data_provider_params)
 
         self._scheduler = AsyncIOScheduler()
 
         self._notification_queue: asyncio.Queue[
-            Tuple[NotificationType, Schema | None, Set[str], str | None, str | None]
+            Tuple[NotificationType, Schema | None, AbstractSet[str], str | None, str | None]
         ] = asyncio.Queue()
         self._notification_dispatcher = None
 
@@ -51,23 +62,15 @@ class NerdDiaryServer(AsyncApplication, SessionMixin, PollMixin):
         )
 
         self._actve_connections: Dict[str, WebSocket] = {}
-        self._message_queue: asyncio.Queue[Tuple[str, str]] = asyncio.Queue()
-        self._message_dispatcher: asyncio.Task | None = None
 
         self._running = False
 
-    @property
-    def message_queue(self) -> asyncio.Queue[Tuple[str, str]]:
-        """Stores tuples of (client_id, raw message data)"""
-        return self._message_queue
-
     async def _astart(self):
         self._logger.debug("Starting NerdDiary Server")
 
         self._scheduler.start()
         self._running = True
         self._notification_dispatcher = asyncio.create_task(self._notification_dispatch())
-        self._message_dispatcher = asyncio.create_task(self._message_dispatch())
 
         await self._sessions.init_sessions()
         return True
@@ -85,16 +88,13 @@ class NerdDiaryServer(AsyncApplication, SessionMixin, PollMixin):
             with suppress(asyncio.CancelledError):
                 await self._notification_dispatcher
 
-        # Disconnect all clients
-        for client in self._actve_connections:
-            self._logger.debug(f"Disconecting {client=}")
-            await self.disconnect_client(client)
-
-        # If message dispatcher exist, wait for it to stop
-        if self._message_dispatcher and self._message_dispatcher.cancel():
-            self._logger.debug("Waiting for Websocket Message dispatcher to gracefully finish")
-            with suppress(asyncio.CancelledError):
-                await self._message_dispatcher
+        # Disconnect all clients. Snapshot ids first, since disconnect_client removes them from active connections
+        client_ids = list(self._actve_connections)
+        self._logger.debug(f"Disconecting clients {client_ids}")
+        results = await asyncio.gather(*map(self.disconnect_client, client_ids), return_exceptions=True)
+        for client, result in zip(client_ids, results):
+            if isinstance(result, Exception):
+                self._logger.error(f"Failed to disconnect {client=}: {result!r}")
 
         # Shutdown the scheduler
         self._scheduler.shutdown(wait=False)
@@ -106,78 +106,102 @@ class NerdDiaryServer(AsyncApplication, SessionMixin, PollMixin):
         self._logger.debug("Starting notification dispatcher")
 
         while self._running:
-            type = data = exclude = source = target = None
+            batch = []
             try:
-                # Wait for clients
-                if len(self._actve_connections) == 0:
-                    self._logger.debug("Waiting for client connection")
-                    await asyncio.sleep(1)
-
-                type, data, exclude, source, target = await self._notification_queue.get()
-                if target:
-                    self._logger.debug(
-                        f"Sending notification to client id <{target}>: {type=} data={mask_sensitive(str(data))} {source=} {exclude=}"
-                    )
-                    await self.send_personal_message(client_id=target, message=generate_notification(type, data))
-
-                    self._logger.debug("Finished sending notification")
+                batch.append(await self._notification_queue.get())
+                # Coalesce a burst of notifications (e.g. session updates on startup) into as few messages as possible
+                while len(batch) < self.NOTIFICATION_BATCH_SIZE:
+                    try:
+                        batch.append(self._notification_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+
+                if not self._actve_connections:
+                    # Nobody to deliver to, don't bother serializing
+                    self._logger.debug(f"No clients connected. Dropping {len(batch)} notification(s)")
                 else:
-                    if source:
-                        # Force exclude source form notification
-                        exclude.add(source)
-                    self._logger.debug(
-                        f"Starting broadcasting notification: {type=} data={mask_sensitive(str(data))} {source=} {exclude=}"
-                    )
-                    await self.broadcast(generate_notification(type, data), exclude=exclude)
-
-                    self._logger.debug("Finished broadcasting notification")
-                self._notification_queue.task_done()
-
+                    await self._send_notifications(batch)
             except asyncio.CancelledError:
                 break
             except Exception:
                 self._logger.exception("Unexpected exception in notification dispatcher")
+            finally:
+                # Only account for the items actually taken off the queue
+                for _ in batch:
+                    self._notification_queue.task_done()
 
-    async def _message_dispatch(self):
-        self._logger.debug("Starting message dispatcher")
+    async def _send_notifications(
+        self, batch: List[Tuple[NotificationType, Schema | None, AbstractSet[str], str | None, str | None]]
+    ):
+        # Group consecutive notifications with the same recipients, so their order is kept
+        groups: List[Tuple[str | None, FrozenSet[str], List[Tuple[NotificationType, Schema | None]]]] = []
+        for type, data, exclude, source, target in batch:
+            # Build the recipients' exclude set once per notification and never mutate the caller's set
+            if target:
+                exclude = frozenset()
+            elif source:
+                # Force exclude source form notification
+                exclude = frozenset(exclude | {source})
+            else:
+                exclude = frozenset(exclude)
 
-        client_id = None
+            if groups and groups[-1][0] == target and groups[-1][1] == exclude:
+                groups[-1][2].append((type, data))
+            else:
+                groups.append((target, exclude, [(type, data)]))
 
-        while self._running:
-            try:
-                client_id, raw_response = await self._message_queue.get()
-                self._logger.debug(f"Recieved message <{mask_sensitive(raw_response)}>")
-                ws = self._actve_connections.get(client_id)
-
-                if not ws:
-                    raise RuntimeError()
-
-                parsed_response = json.loads(raw_response)
-                if "method" in parsed_response:
-                    # Execute local method (from RPC call)
-                    self._logger.debug(
-                        f"Processing incoming RPC call from a client {client_id=}. Method <{parsed_response['method']}>. JSON RPC id: {parsed_response['id']}"
-                    )
-                    if response := await async_dispatch(
-                        raw_response, context=self, serializer=partial(json.dumps, default=pydantic_encoder)
-                    ):
-                        await ws.send_text(response)
-                else:
-                    # Process unrecognized message
-                    self._logger.debug(f"Got unexpected message from a client {client_id=}. Ignoring")
-            except RuntimeError:
-                err = f"NerdDiary client connection terminated by a client {client_id=}. Skipping message"
-                self._logger.error(err)
-            except asyncio.CancelledError:
-                break
-            except Exception:
-                self._logger.exception("Unexpected exception in message dispatcher")
-                raise
-            finally:
-                try:
-                    self._message_queue.task_done()
-                except ValueError:
-                    pass
+        for target, exclude, notifications in groups:
+            if len(notifications) == 1:
+                message = generate_notification(*notifications[0])
+            else:
+                message = generate_notifications(notifications)
+
+            if target:
+                self._logger.debug(
+                    f"Sending {len(notifications)} notification(s) to client id <{target}>: {mask_sensitive(message)}"
+                )
+                await self.send_personal_message(client_id=target, message=message)
+
+                self._logger.debug("Finished sending notification")
+            else:
+                self._logger.debug(
+                    f"Starting broadcasting {len(notifications)} notification(s): {mask_sensitive(message)} {exclude=}"
+                )
+                await self.broadcast(message, exclude=exclude)
+
+                self._logger.debug("Finished broadcasting notification")
+
+    async def handle_message(self, client_id: str, raw_message: str):
+        """Processes a single raw message from a client.
+
+        Websocket endpoints call this directly, so a slow RPC call only holds up the client that made it
+        """
+        self._logger.debug(f"Recieved message <{mask_sensitive(raw_message)}>")
+
+        try:
+            ws = self._actve_connections.get(client_id)
+
+            if not ws:
+                raise RuntimeError()
+
+            message = fastjson.loads(raw_message)
+            if isinstance(message, dict) and "method" in message:
+                # Execute local method (from RPC call). The message is already parsed, so hand it over as is
+                self._logger.debug(
+                    f"Processing incoming RPC call from a client {client_id=}. Method <{message['method']}>. JSON RPC id: {message.get('id')}"
+                )
+                if response := await async_dispatch(
+                    raw_message, context=self, deserializer=lambda _: message, serializer=_rpc_serializer
+                ):
+                    await ws.send_text(response)
+            else:
+                # Process unrecognized message
+                self._logger.debug(f"Got unexpected message from a client {client_id=}. Ignoring")
+        except fastjson.JSONDecodeError:
+            self._logger.debug(f"Got malformed message from a client {client_id=}. Ignoring")
+        except RuntimeError:
+            err = f"NerdDiary client connection terminated by a client {client_id=}. Skipping message"
+            self._logger.error(err)
 
     def stop(self):
         self._scheduler.pause()
@@ -185,9 +209,9 @@ class NerdDiaryServer(AsyncApplication, SessionMixin, PollMixin):
 
     async def disconnect_client(self, client_id: str):
         self._logger.debug(f"Disconnecting {client_id=} from NerdDiary server")
-        ws = self._actve_connections[client_id]
+        # Remove before closing, so the websocket endpoint doesn't report this client as disconnected again
+        ws = self._actve_connections.pop(client_id)
         await ws.close()
-        self._actve_connections.pop(client_id)
         await self.notify(
             NotificationType.SERVER_CLIENT_DISCONNECTED, ClientSchema(client_id=client_id), source=client_id
         )
@@ -202,34 +226,40 @@ class NerdDiaryServer(AsyncApplication, SessionMixin, PollMixin):
         await self.notify(NotificationType.SERVER_CLIENT_CONNECTED, ClientSchema(client_id=client_id), source=client_id)
         self._logger.debug(f"Sending {client_id=} all existing sessions. A total of {len(self._sessions._sessions)}")
         for session in self._sessions.get_all():
-            key = None
-            if session._data_connection:
-                key = session._data_connection.key.decode()
             await self.notify(
                 NotificationType.SERVER_SESSION_UPDATE,
-                UserSessionSchema(user_id=session.user_id, user_status=session.user_status, key=key),
+                session.to_schema(with_key=True),
                 target=client_id,
             )
 
     async def on_disconnect_client(self, client_id: str):
         self._logger.debug(f"{client_id=} disconnected from NerdDiary server")
-        self._actve_connections.pop(client_id)
+        if self._actve_connections.pop(client_id, None) is None:
+            # Already disconnected by the server
+            return
+
         await self.notify(
             NotificationType.SERVER_CLIENT_DISCONNECTED, ClientSchema(client_id=client_id), source=client_id
         )
 
-    async def broadcast(self, message: str | bytes, exclude: Set[str] = set()):
+    async def broadcast(self, message: str | bytes, exclude: AbstractSet[str] = frozenset()):
         self._logger.debug(
             f"Broadcasting message={mask_sensitive(message if isinstance(message, str) else message.decode())} to all clients except {exclude=}"
         )
 
+        client_ids = []
+        sends = []
         for client_id, ws in self._actve_connections.items():
             if client_id not in exclude:
                 self._logger.debug(f"Sending tp {client_id=}")
-                if isinstance(message, str):
-                    await ws.send_text(message)
-                else:
-                    await ws.send_bytes(message)
+                client_ids.append(client_id)
+                sends.append(ws.send_text(message) if isinstance(message, str) else ws.send_bytes(message))
+
+        # Send to all clients concurrently, so one slow socket doesn't hold the rest
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for client_id, result in zip(client_ids, results):
+            if isinstance(result, Exception):
+                self._logger.error(f"Failed to send message to {client_id=}: {result!r}")
 
     async def send_personal_message(self, client_id: str, message: str | bytes):
         self._logger.debug(
@@ -246,8 +276,11 @@ class NerdDiaryServer(AsyncApplication, SessionMixin, PollMixin):
         self,
         type: NotificationType,
         data: Schema | None = None,
-        exclude: Set[str] = set(),
+        exclude: AbstractSet[str] = frozenset(),
         source: str | None = None,
         target: str | None = None,
     ):
-        await self._notification_queue.put((type, data, exclude, source, target))
+        if not self._actve_connections:
+            return
+
+        self._notification_queue.put_nowait((type, data, exclude, source, target))
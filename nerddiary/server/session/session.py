@@ -22,12 +22,23 @@ from ...user.user import User
 from ..schema import NotificationType, PollBaseSchema, PollLogSchema, PollLogsSchema, Schema, UserSessionSchema
 from .status import UserSessionStatus
 
-from typing import Any, Coroutine, Dict, Iterable, List, Set, Tuple
+from typing import AbstractSet, Dict, Iterable, List, Tuple
 
 CONFIG_DATA_CATEGORY = "CONFIG"
 
 
 class UserSession:
+    __slots__ = (
+        "_session_spawner",
+        "_user_id",
+        "_user_status",
+        "_user_config",
+        "_data_connection",
+        "_active_polls",
+        "_schema",
+        "_schema_with_key",
+    )
+
     def __init__(self, session_spawner: SessionSpawner, user_id: str, user_status: UserSessionStatus) -> None:
         self._session_spawner = session_spawner
         self._user_id = user_id
@@ -35,6 +46,8 @@ class UserSession:
         self._user_config: User | None = None
         self._data_connection: DataConnection | None = None
         self._active_polls: Dict[UUID, PollWorkflow] = {}
+        self._schema: UserSessionSchema | None = None
+        self._schema_with_key: UserSessionSchema | None = None
 
     @property
     def user_id(self) -> str:
@@ -44,6 +57,21 @@ class UserSession:
     def user_status(self) -> UserSessionStatus:
         return self._user_status
 
+    def to_schema(self, with_key: bool = False) -> UserSessionSchema:
+        """Returns session schema, optionally including the data key. Cached until status or data connection changes"""
+        if with_key:
+            if self._schema_with_key is None:
+                key = self._data_connection.key.decode() if self._data_connection else None
+                self._schema_with_key = UserSessionSchema(user_id=self.user_id, user_status=self.user_status, key=key)
+            return self._schema_with_key
+
+        if self._schema is None:
+            self._schema = UserSessionSchema(user_id=self.user_id, user_status=self.user_status)
+        return self._schema
+
+    def _invalidate_schema(self) -> None:
+        self._schema = self._schema_with_key = None
+
     async def unlock(self, password_or_key: str | bytes):
         if self.user_status > UserSessionStatus.LOCKED:
             return
@@ -58,6 +86,8 @@ class UserSession:
             self._data_connection = self._session_spawner._data_provoider.get_connection(
                 user_id=self.user_id, password_or_key=password_or_key
             )
+            # The key is part of the cached schema
+            self._invalidate_schema()
         except IncorrectPasswordKeyError:
             raise NerdDiaryError(NerdDiaryErrorCode.SESSION_INCORRECT_PASSWORD_OR_KEY)
 
@@ -274,6 +304,7 @@ class UserSession:
             )
 
         ret = PollLogsSchema(logs=[])
+        logs: Iterable[Tuple[int, str, datetime.datetime, str]]
         if log_id:
             try:
                 logs = [self._data_connection.get_log(id=log_id)]
@@ -283,9 +314,9 @@ class UserSession:
                     str(log_id),
                 )
         elif poll_name or count or skip:
-            logs = self._data_connection.get_poll_logs(poll_code=poll_name, max_rows=count, skip=skip)
+            logs = self._data_connection.iter_poll_logs(poll_code=poll_name, max_rows=count, skip=skip)
         else:
-            logs = self._data_connection.get_all_logs()
+            logs = self._data_connection.iter_all_logs()
 
         for id, poll_name, poll_ts, data in logs:
             log = PollLogSchema(
@@ -340,6 +371,9 @@ class UserSession:
         assert self._user_config
 
         ret = 0
+        # New logs are grouped by poll and appended in one batch per poll, updates are written in a single batch
+        new_logs: Dict[str, List[Tuple[datetime.datetime, str]]] = {}
+        updated_logs: List[Tuple[int, datetime.datetime, str]] = []
         for poll in data.logs:
             poll_conf = self._user_config._polls_dict.get(poll.poll_name)
             if not poll_conf:
@@ -351,21 +385,33 @@ class UserSession:
             )
 
             if workflow.log_id is not None:
-                self._data_connection.update_log(workflow.log_id, *workflow.get_save_data())
+                updated_logs.append((workflow.log_id, *workflow.get_save_data()))
             else:
-                self._data_connection.append_log(workflow.poll_name, *workflow.get_save_data())
+                new_logs.setdefault(workflow.poll_name, []).append(workflow.get_save_data())
 
             ret += 1
 
+        self._data_connection.update_logs(updated_logs)
+        for poll_name, logs in new_logs.items():
+            self._data_connection.append_logs(poll_name, logs)
+
         return ret
 
     async def close_all_polls(self, save: bool):
-        for workflow in self._active_polls.values():
-            if save:
+        if save:
+            new_logs: Dict[str, List[Tuple[datetime.datetime, str]]] = {}
+            updated_logs: List[Tuple[int, datetime.datetime, str]] = []
+            for workflow in self._active_polls.values():
                 if workflow.log_id is not None:
-                    self._data_connection.update_log(workflow.log_id, *workflow.get_save_data())
+                    updated_logs.append((workflow.log_id, *workflow.get_save_data()))
                 else:
-                    self._data_connection.append_log(workflow.poll_name, *workflow.get_save_data())
+                    new_logs.setdefault(workflow.poll_name, []).append(workflow.get_save_data())
+
+            for poll_name, logs in new_logs.items():
+                self._data_connection.append_logs(poll_name, logs)
+
+            if updated_logs:
+                self._data_connection.update_logs(updated_logs)
 
         self._active_polls.clear()
 
@@ -408,11 +454,10 @@ class UserSession:
             return
 
         self._user_status = new_status
+        self._invalidate_schema()
         await self._session_spawner.notify(
             type=NotificationType.SERVER_SESSION_UPDATE,
-            data=UserSessionSchema(
-                user_id=self.user_id, user_status=self.user_status, key=self._data_connection.key.decode()
-            ),
+            data=self.to_schema(with_key=True),
         )
 
     async def close(self):
@@ -424,12 +469,15 @@ class UserSession:
                     self._user_config.json(exclude_unset=True, ensure_ascii=False), category=CONFIG_DATA_CATEGORY
                 )
 
+            self._data_connection.close()
+            self._invalidate_schema()
+
 
 class SessionSpawner:
     def __init__(
         self,
         data_provider: DataProvider,
-        notification_queue: asyncio.Queue[Tuple[NotificationType, Schema | None, Set[str], str | None, str | None]],
+        notification_queue: asyncio.Queue[Tuple[NotificationType, Schema | None, AbstractSet[str], str | None, str | None]],
         scheduler: AsyncIOScheduler,
         logger: logging.Logger = logging.getLogger(__name__),
     ) -> None:
@@ -459,6 +507,8 @@ class SessionSpawner:
         for session in self._sessions.values():
             await session.close()
 
+        self._data_provoider.close()
+
     async def init_sessions(self) -> None:
         sessions = {}
 
@@ -470,28 +520,23 @@ class SessionSpawner:
 
         self._sessions = sessions
 
-        if len(self._sessions) > 0:
-            to_notify: List[Coroutine[Any, Any, None]] = []
-            for user_id, ses in self._sessions.items():
-                to_notify.append(
-                    self.notify(
-                        NotificationType.SERVER_SESSION_UPDATE,
-                        UserSessionSchema(user_id=user_id, user_status=ses.user_status),
-                    )
-                )
-
-            if to_notify:
-                await asyncio.gather(*to_notify)
+        # notify only enqueues, so there is nothing to gain from running it as concurrent tasks.
+        # The notification dispatcher coalesces this burst into a single batched message
+        for user_id, ses in self._sessions.items():
+            await self.notify(
+                NotificationType.SERVER_SESSION_UPDATE,
+                ses.to_schema(),
+            )
 
     async def notify(
         self,
         type: NotificationType,
         data: Schema | None = None,
-        exclude: Set[str] = set(),
+        exclude: AbstractSet[str] = frozenset(),
         source: str | None = None,
         target: str | None = None,
     ):
-        await self._notification_queue.put((type, data, exclude, source, target))
+        self._notification_queue.put_nowait((type, data, exclude, source, target))
 
     async def _load_or_create_session(self, user_id: str) -> UserSession:
         self._logger.debug("Loading session")
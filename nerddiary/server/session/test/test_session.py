@@ -1,3 +1,27 @@
+import asyncio
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from nerddiary.server.session.session import SessionSpawner, UserSession
+from nerddiary.server.session.status import UserSessionStatus
+
+import pytest
+
+
 class TestUserSession:
     def test_correct_json_parse(self):
         pass
+
+    @pytest.mark.usefixtures("fast_kdf")
+    async def test_schema_cache(self, test_data_provider):
+        spawner = SessionSpawner(
+            data_provider=test_data_provider, notification_queue=asyncio.Queue(), scheduler=AsyncIOScheduler()
+        )
+        session = UserSession(session_spawner=spawner, user_id="schema_cache", user_status=UserSessionStatus.NEW)
+
+        assert session.to_schema(with_key=True).key is None
+        assert session.to_schema(with_key=True) is session.to_schema(with_key=True)
+
+        await session.unlock("password")
+        assert session._data_connection
+        assert session.to_schema(with_key=True).key == session._data_connection.key.decode()
+        assert session.to_schema().key is None
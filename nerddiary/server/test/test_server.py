@@ -1,3 +1,132 @@
-class TestClient:
-    def test_correct_json_parse(self):
-        assert True
+from __future__ import annotations
+
+import asyncio
+
+from nerddiary.server.config import NerdDiaryServerConfig
+from nerddiary.server.schema import (
+    ClientSchema,
+    NotificationType,
+    generate_notification,
+    generate_notifications,
+)
+from nerddiary.server.server import NerdDiaryServer
+from nerddiary.utils import fastjson
+
+import pytest
+
+
+class MockWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message: str):
+        self.sent.append(message)
+
+
+@pytest.fixture
+def server(tmp_path):
+    return NerdDiaryServer(config=NerdDiaryServerConfig(data_provider_params={"base_path": str(tmp_path)}))
+
+
+class TestNotifications:
+    def test_single_notification_encoding(self):
+        message = generate_notification(NotificationType.SERVER_CLIENT_CONNECTED, ClientSchema(client_id="a"))
+
+        assert fastjson.loads(message) == {
+            "notification": str(NotificationType.SERVER_CLIENT_CONNECTED.value),
+            "data": {"schema": "ClientSchema", "data": {"client_id": "a"}},
+        }
+        assert fastjson.loads(generate_notification(NotificationType.SERVER_POLL_REMINDER)) == {
+            "notification": str(NotificationType.SERVER_POLL_REMINDER.value),
+            "data": None,
+        }
+
+    def test_batch_notification_encoding(self):
+        notifications = [
+            (NotificationType.SERVER_CLIENT_CONNECTED, ClientSchema(client_id="a")),
+            (NotificationType.SERVER_POLL_REMINDER, None),
+        ]
+
+        assert fastjson.loads(generate_notifications(notifications)) == [
+            fastjson.loads(generate_notification(type, data)) for type, data in notifications
+        ]
+
+    async def test_send_notifications_groups_consecutive(self, server: NerdDiaryServer):
+        server._actve_connections = {"a": MockWebSocket(), "b": MockWebSocket(), "c": MockWebSocket()}
+
+        first = ClientSchema(client_id="1")
+        second = ClientSchema(client_id="2")
+        third = ClientSchema(client_id="3")
+        fourth = ClientSchema(client_id="4")
+
+        await server._send_notifications(
+            [
+                # Same recipients: the explicit exclude matches the forced source exclusion
+                (NotificationType.SERVER_CLIENT_CONNECTED, first, frozenset(), "a", None),
+                (NotificationType.SERVER_CLIENT_CONNECTED, second, {"a"}, None, None),
+                (NotificationType.SERVER_SESSION_UPDATE, third, frozenset(), None, "b"),
+                # Not merged with the first group, as it is not consecutive
+                (NotificationType.SERVER_CLIENT_DISCONNECTED, fourth, frozenset(), "a", None),
+            ]
+        )
+
+        batch = generate_notifications(
+            [
+                (NotificationType.SERVER_CLIENT_CONNECTED, first),
+                (NotificationType.SERVER_CLIENT_CONNECTED, second),
+            ]
+        )
+        personal = generate_notification(NotificationType.SERVER_SESSION_UPDATE, third)
+        single = generate_notification(NotificationType.SERVER_CLIENT_DISCONNECTED, fourth)
+
+        assert server._actve_connections["a"].sent == []
+        assert server._actve_connections["b"].sent == [batch, personal, single]
+        assert server._actve_connections["c"].sent == [batch, single]
+
+    async def test_notify_drops_without_connections(self, server: NerdDiaryServer):
+        await server.notify(NotificationType.SERVER_POLL_REMINDER)
+
+        assert server._notification_queue.empty()
+
+    async def test_dispatch_drops_without_connections(self, server: NerdDiaryServer):
+        sent = []
+
+        async def _send_notifications(batch):
+            sent.append(batch)
+
+        server._send_notifications = _send_notifications
+        server._running = True
+
+        # Connection closed after the notifications have been queued
+        server._notification_queue.put_nowait((NotificationType.SERVER_POLL_REMINDER, None, frozenset(), None, None))
+        server._notification_queue.put_nowait((NotificationType.SERVER_POLL_REMINDER, None, frozenset(), None, None))
+
+        dispatcher = asyncio.create_task(server._notification_dispatch())
+        await asyncio.wait_for(server._notification_queue.join(), timeout=1)
+
+        dispatcher.cancel()
+        await dispatcher
+
+        assert sent == []
+        assert server._notification_queue.empty()
+
+
+class TestHandleMessage:
+    async def test_rpc_call(self, server: NerdDiaryServer):
+        ws = server._actve_connections["a"] = MockWebSocket()
+
+        await server.handle_message("a", '{"jsonrpc": "2.0", "method": "no_such_method", "id": 1}')
+
+        assert len(ws.sent) == 1
+        response = fastjson.loads(ws.sent[0])
+        assert response["id"] == 1 and response["error"]["message"] == "Method not found"
+
+    async def test_ignores_non_requests(self, server: NerdDiaryServer):
+        ws = server._actve_connections["a"] = MockWebSocket()
+
+        await server.handle_message("a", '{"jsonrpc": "2.0", "result": "\\"method\\"", "id": 1}')
+        await server.handle_message("a", '["method"]')
+        await server.handle_message("a", '"method"')
+        await server.handle_message("a", '{"method": ')
+
+        assert ws.sent == []
@@ -11,6 +11,7 @@ from pydantic.fields import Field
 from ..poll.poll import Poll
 from ..primitive.timezone import TimeZone
 from ..report.report import Report
+from ..utils import fastjson
 
 from typing import Dict, List, Optional
 
@@ -33,6 +34,8 @@ class User(BaseModel):
         title = "User Configuration"
         extra = "forbid"
         json_encoders = {tzinfo: lambda t: str(t)}
+        json_loads = fastjson.loads
+        json_dumps = fastjson.model_dumps
 
     def __init__(self, **data) -> None:
         super().__init__(**data)
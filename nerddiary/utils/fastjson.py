@@ -0,0 +1,42 @@
+""" JSON helpers. Use orjson when it is installed, otherwise fall back to the standard library """
+
+import json
+
+from typing import Any, Callable
+
+# orjson.JSONDecodeError is a subclass of json.JSONDecodeError, so this is safe to catch for both backends
+JSONDecodeError = json.JSONDecodeError
+
+loads: Callable[[str | bytes], Any]
+
+try:
+    import orjson
+
+    loads = orjson.loads
+
+    # Dates and times go through `default`, same as with the standard library. orjson's own formatting
+    # differs from isoformat in places and rejects `datetime.time` with tzinfo (e.g. poll reminder times)
+    _DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(obj: Any, *, default: Callable[[Any], Any] | None = None) -> str:
+        """Serializes `obj` to a JSON string. `default` is called for objects that can't be serialized natively"""
+        return orjson.dumps(obj, default=default, option=_DUMPS_OPTIONS).decode()
+
+    def model_dumps(obj: Any, *, default: Callable[[Any], Any] | None = None, **dumps_kwargs: Any) -> str:
+        """`json_dumps` for pydantic model configs. orjson always emits utf-8, so any stdlib specific
+        `dumps_kwargs` (e.g. `indent` or `ensure_ascii=True`) fall back to the standard library"""
+        if not dumps_kwargs or dumps_kwargs == {"ensure_ascii": False}:
+            return dumps(obj, default=default)
+
+        return json.dumps(obj, default=default, **dumps_kwargs)
+
+except ImportError:  # pragma: no cover
+    loads = json.loads
+
+    def dumps(obj: Any, *, default: Callable[[Any], Any] | None = None) -> str:
+        """Serializes `obj` to a JSON string. `default` is called for objects that can't be serialized natively"""
+        return json.dumps(obj, default=default)
+
+    def model_dumps(obj: Any, *, default: Callable[[Any], Any] | None = None, **dumps_kwargs: Any) -> str:
+        """`json_dumps` for pydantic model configs"""
+        return json.dumps(obj, default=default, **dumps_kwargs)